@@ -0,0 +1,89 @@
+"""
+Render time per board card (utils/board_cards.py).
+
+Times a direct render_card() call for each board at a few sizes, then
+the full async path: the first render through the process pool and a
+cache hit for unchanged data.
+
+Run from the repo root:
+    python -m benchmarks.bench_board_cards
+"""
+import asyncio
+import random
+import statistics
+import time
+
+from utils import board_cards
+
+RUNS = 20
+
+
+def _rows(n: int, kind: str) -> list[dict]:
+    rng = random.Random(n)
+    rows = []
+    for i in range(n):
+        score = max(n * 2 - i * 2 - rng.randint(0, 1), 0)
+        name = rng.choice(["azan", "trader", "mm", "client", "Ｖｏｕｃｈ", "légit"]) + f"_{i}" * rng.randint(1, 4)
+        if kind == "quota":
+            rows.append({"rank": i + 1, "name": name, "value": f"{score % 9} / 5",
+                         "progress": (score % 9) / 5, "done": score % 9 >= 5, "avatar": None})
+        else:
+            rows.append({"rank": i + 1, "name": name, "value": f"{score} points", "progress": None, "avatar": None})
+    return rows
+
+
+BOARDS = {
+    "clients (10)": ("TOP CLIENTS THIS MONTH", _rows(10, "points")),
+    "middlemen (10)": ("MIDDLEMAN LEADERBOARD", _rows(10, "points")),
+    "quota (25)": ("WEEKLY MIDDLEMEN QUOTA", _rows(25, "quota")),
+    "quota (100)": ("WEEKLY MIDDLEMEN QUOTA", _rows(100, "quota")),
+}
+
+
+def _spec(title: str, rows: list[dict]) -> dict:
+    return {"title": title, "subtitle": "benchmark", "footer": "benchmark", "rows": rows}
+
+
+def _time_ms(fn, runs: int = RUNS) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def _async_path():
+    spec = _spec(*BOARDS["clients (10)"])
+    start = time.perf_counter()
+    await board_cards.render(spec)
+    cold = (time.perf_counter() - start) * 1000
+
+    spec = _spec("TOP CLIENTS THIS MONTH", _rows(11, "points"))
+    start = time.perf_counter()
+    await board_cards.render(spec)
+    warm = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    await board_cards.render(spec)
+    cached = (time.perf_counter() - start) * 1000
+    board_cards.shutdown()
+    return cold, warm, cached
+
+
+def main():
+    print(f"{'board':>15} | {'ms/render':>9} | {'PNG KB':>6}")
+    for name, (title, rows) in BOARDS.items():
+        spec = _spec(title, rows)
+        png = board_cards.render_card(spec)
+        print(f"{name:>15} | {_time_ms(lambda: board_cards.render_card(spec)):>9.1f} | {len(png) / 1024:>6.0f}")
+
+    cold, warm, cached = asyncio.run(_async_path())
+    print()
+    print(f"process pool, first render (spawns worker): {cold:8.1f} ms")
+    print(f"process pool, new data:                     {warm:8.1f} ms")
+    print(f"unchanged data (cache hit):                 {cached:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Per-message cost of the vouch keyword matcher as the keyword list grows.
+
+Run from the repo root:
+    python -m benchmarks.bench_vouch_matcher
+"""
+import random
+import string
+import timeit
+
+from utils.vouch_matcher import VouchMatcher
+
+BASE_KEYWORDS = [
+    "vouch", "+rep", "rep+", "trusted", "legit", "smooth trade",
+    "recommend", "thanks mm", "thank you mm", "great mm"
+]
+MESSAGES = [
+    "vouch for @someone, smooth trade as always",
+    "thanks mm, got my items fast",
+    "anyone selling a harvester? dm me with offers please",
+    "lol that was a crazy round, gg everyone " * 4,
+]
+SIZES = [10, 100, 1_000, 10_000]
+RUNS = 2_000
+
+
+def _keywords(n: int) -> list[str]:
+    rng = random.Random(n)
+    extra = [
+        " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+                 for _ in range(rng.randint(1, 2)))
+        for _ in range(max(n - len(BASE_KEYWORDS), 0))
+    ]
+    return BASE_KEYWORDS + extra
+
+
+def _naive(keywords):
+    # What VouchDetector did before: substring test per keyword
+    return lambda content: any(k in content.lower() for k in keywords)
+
+
+def main():
+    print(f"{'keywords':>9} | {'matcher µs/msg':>14} | {'naive µs/msg':>12}")
+    for n in SIZES:
+        keywords = _keywords(n)
+        matcher = VouchMatcher(keywords)
+        naive = _naive(keywords)
+        compiled = timeit.timeit(lambda: [matcher(m) for m in MESSAGES], number=RUNS)
+        baseline = timeit.timeit(lambda: [naive(m) for m in MESSAGES], number=RUNS)
+        per_msg = RUNS * len(MESSAGES) / 1e6
+        print(f"{n:>9} | {compiled / per_msg:>14.2f} | {baseline / per_msg:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import discord
 from discord.ext import commands
 from web.server import make_app
 from utils.constants import PORT
+from utils import db, roblox, board_cards, avatar_cache, dispatch
+from utils.indexes import ensure_indexes
 
 load_dotenv()
 
@@ -53,6 +55,16 @@ async def on_ready():
         for guild in bot.guilds:
             asyncio.create_task(mm_lb_cog.update_or_create_lb(guild))
 
+# -------- Messages --------
+@bot.event
+async def on_message(message: discord.Message):
+    # Cogs subscribe through utils/dispatch.py by channel / guild, so each
+    # message only reaches the handlers that care about where it was sent
+    dispatch.dispatch(message)
+    # The command parser only needs to see messages that can be commands
+    if not message.author.bot and message.content.startswith(bot.command_prefix):
+        await bot.process_commands(message)
+
 # -------- Web server --------
 async def run_web():
     import aiohttp.web
@@ -66,10 +78,21 @@ async def run_web():
 # -------- Main --------
 async def main():
     await load_cogs()
-    await asyncio.gather(
-        bot.start(os.getenv("TOKEN")),
-        run_web()
-    )
+    try:
+        # Open the Mongo pool before the gateway connects so the first interaction is warm
+        await db.warm_up()
+        await ensure_indexes()
+    except Exception as e:
+        print(f"[❌] MongoDB warm-up failed: {e}")
+    try:
+        await asyncio.gather(
+            bot.start(os.getenv("TOKEN")),
+            run_web()
+        )
+    finally:
+        await roblox.close()
+        await avatar_cache.close()
+        board_cards.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,8 +1,8 @@
 import discord
 from discord.ext import commands
-import aiohttp
 from datetime import datetime, timezone
 from utils.db import collections
+from utils import roblox
 
 class ApplyCommand(commands.Cog):
     def __init__(self, bot):
@@ -34,13 +34,6 @@ class ApplyCommand(commands.Cog):
         if not (ctx.author.guild_permissions.administrator or discord.utils.get(ctx.author.roles, id=admin_role_id)):
             return await ctx.reply("❌ You don't have permission to use this command.")
 
-        colls = await collections()
-        loading_msg = await ctx.reply(f"🔎 Checking Roblox user `{roblox_user}`...")
-
-        try:
-            user_data = await self.get_roblox_user(roblox_user)
-            if not user_data:
-                return await loading_msg.edit(content=f"❌ Could not find Roblox user `{roblox_user}`.")
         target = member or ctx.author
 
         colls = await collections()
@@ -50,39 +43,21 @@ class ApplyCommand(commands.Cog):
             return await ctx.reply(f"{target.mention} has not saved a Roblox user yet. Use `$s <robloxUser>`")
 
         query = saved["robloxUser"]
-        user_id = None
-        user_data = None
         user_thumbnail_url = "https://www.roblox.com/images/logo/roblox_logo_300x300.png"
 
         loading_msg = await ctx.reply(f"Fetching Roblox info for **{query}**...")
 
         try:
-            async with aiohttp.ClientSession() as session:
-                # Username → ID
-                if not query.isdigit():
-                    async with session.post(
-                        "https://users.roblox.com/v1/usernames/users",
-                        json={"usernames": [query], "excludeBannedUsers": False}
-                    ) as resp:
-                        data = await resp.json()
-                        if data.get("data") and len(data["data"]) > 0:
-                            user_id = data["data"][0]["id"]
-                        else:
-                            return await loading_msg.edit(content=f"Could not find Roblox user `{query}`.")
-                else:
-                    user_id = int(query)
-
-                # Fetch user details
-                async with session.get(f"https://users.roblox.com/v1/users/{user_id}") as resp:
-                    user_data = await resp.json()
-
-                # Fetch thumbnail
-                async with session.get(
-                    f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={user_id}&size=150x150&format=Png&isCircular=false"
-                ) as resp:
-                    thumb_data = await resp.json()
-                    if thumb_data.get("data") and len(thumb_data["data"]) > 0:
-                        user_thumbnail_url = thumb_data["data"][0]["imageUrl"]
+            user_id = await roblox.resolve_user_id(query)
+            if not user_id:
+                return await loading_msg.edit(content=f"Could not find Roblox user `{query}`.")
+
+            # Profile + thumbnail in parallel, served from cache on repeat lookups
+            bundle = await roblox.get_user_bundle(user_id)
+            user_data = bundle["profile"]
+            if not user_data:
+                raise RuntimeError(f"profile for {user_id} unavailable")
+            user_thumbnail_url = bundle["headshot"] or user_thumbnail_url
 
             # Profile link
             profile_link = f"https://www.roblox.com/users/{user_id}/profile"
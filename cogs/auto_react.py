@@ -1,5 +1,6 @@
 import discord
 from discord.ext import commands
+from utils import dispatch
 
 
 TARGET_CHANNEL_ID = 1373027974827212923  
@@ -8,14 +9,13 @@ EMOJI = "<:emoji_46:1428129673237237781>"
 class AutoReact(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        dispatch.subscribe("auto_react", self.handle_message, channels=[TARGET_CHANNEL_ID])
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        
-        if message.author.bot:
-            return
+    def cog_unload(self):
+        dispatch.unsubscribe("auto_react")
 
-        
+    async def handle_message(self, message: discord.Message):
+        # Only called for TARGET_CHANNEL_ID (see utils/dispatch.py)
         if message.channel.id == TARGET_CHANNEL_ID:
             try:
 
@@ -0,0 +1,271 @@
+import os
+import asyncio
+import secrets
+import discord
+from discord.ext import commands
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from utils.db import collections
+from utils import ticket_registry, boards, vouch_state, quota_service, points
+
+# -------------------------
+# CONFIG
+# -------------------------
+CLOSE_JOB_WORKERS = int(os.getenv("CLOSE_JOB_WORKERS", "3"))      # closes processed at once
+CLOSE_JOB_MAX_ATTEMPTS = int(os.getenv("CLOSE_JOB_MAX_ATTEMPTS", "5"))
+CLOSE_JOB_LEASE = timedelta(seconds=int(os.getenv("CLOSE_JOB_LEASE_SECONDS", "300")))
+RETRY_BASE_SECONDS = 5          # 5s, 10s, 20s, ... between attempts
+POLL_INTERVAL = 30              # also picks up jobs left behind by a crash
+
+# Job kind -> steps, in order. A step is removed from the job once it
+# succeeds, so a retry (or a restart) resumes at the first unfinished step.
+PIPELINES = {
+    # Vouch confirmed: the whole close in the background
+    "vouch": ["transcript", "points", "middleman", "boards", "ticket", "channel"],
+    # $close: credit the middleman; the panel buttons handle the rest
+    "close": ["middleman", "boards"],
+}
+
+
+class CloseJobs(commands.Cog):
+    """
+    Durable ticket-close queue. Jobs live in the closeJobs collection and are
+    leased by a fixed pool of workers, so a crash mid-close resumes from the
+    last finished step after the lease expires instead of leaving partial state.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self._wake = asyncio.Event()
+        self._workers: list[asyncio.Task] = []
+        self._steps = {
+            "transcript": self._step_transcript,
+            "points": self._step_points,
+            "middleman": self._step_middleman,
+            "boards": self._step_boards,
+            "ticket": self._step_ticket,
+            "channel": self._step_channel,
+        }
+
+    async def cog_load(self):
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(CLOSE_JOB_WORKERS)]
+
+    def cog_unload(self):
+        for task in self._workers:
+            task.cancel()
+
+    # ------------------------- Enqueue -------------------------
+    async def enqueue(self, kind: str, channel: discord.TextChannel, claimed_by, users=(), requested_by=None) -> bool:
+        """
+        Queues a close for `channel`. Returns False if the same close is already
+        queued (double clicks and repeated commands don't run it twice).
+        """
+        now = datetime.utcnow()
+        colls = await collections()
+        result = await colls["closeJobs"].update_one(
+            {"_id": f"{kind}:{channel.id}"},
+            {"$setOnInsert": {
+                "kind": kind,
+                "channelId": str(channel.id),
+                "guildId": str(channel.guild.id),
+                "claimedBy": str(claimed_by) if claimed_by else None,
+                "users": [str(uid) for uid in users if uid],
+                "requestedBy": str(requested_by) if requested_by else None,
+                "steps": list(PIPELINES[kind]),
+                # Fresh per enqueue: credits made for this run are keyed on it, so a
+                # later close of the same channel (same _id) still counts
+                "runId": secrets.token_hex(8),
+                "status": "pending",
+                "attempts": 0,
+                "runAt": now,
+                "leaseUntil": now,
+                "createdAt": now,
+            }},
+            upsert=True
+        )
+        self._wake.set()
+        return result.upserted_id is not None
+
+    # ------------------------- Workers -------------------------
+    async def _claim(self) -> dict | None:
+        now = datetime.utcnow()
+        colls = await collections()
+        return await colls["closeJobs"].find_one_and_update(
+            # "running" jobs whose lease ran out belong to a worker that died
+            {"status": {"$in": ["pending", "running"]}, "runAt": {"$lte": now}, "leaseUntil": {"$lte": now}},
+            {"$set": {"status": "running", "leaseUntil": now + CLOSE_JOB_LEASE, "leaseToken": secrets.token_hex(8)},
+             "$inc": {"attempts": 1}},
+            sort=[("runAt", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _worker(self, n: int):
+        await self.bot.wait_until_ready()
+        while True:
+            # Cleared before claiming, so an enqueue during the claim still wakes us
+            self._wake.clear()
+            try:
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[CloseJobs] ❌ Worker {n} could not claim a job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Lease expiry hands the job to another worker later
+                print(f"[CloseJobs] ❌ Worker {n} lost job {job['_id']}: {e}")
+
+    async def _heartbeat(self, jobs, owned: dict):
+        """Keeps the lease alive while a step runs (a long transcript can outlast it)."""
+        while True:
+            await asyncio.sleep(CLOSE_JOB_LEASE.total_seconds() / 3)
+            try:
+                result = await jobs.update_one(owned, {"$set": {"leaseUntil": datetime.utcnow() + CLOSE_JOB_LEASE}})
+            except Exception as e:
+                print(f"[CloseJobs] Lease renewal failed for {owned['_id']}: {e}")
+                continue
+            if not result.matched_count:
+                return
+
+    async def _run(self, job: dict):
+        colls = await collections()
+        jobs = colls["closeJobs"]
+        # Every write below only applies while this worker still holds the lease
+        owned = {"_id": job["_id"], "leaseToken": job.get("leaseToken")}
+        heartbeat = asyncio.create_task(self._heartbeat(jobs, owned))
+        channel = None
+        step = None
+        try:
+            channel = await self._get_channel(int(job["channelId"]))
+            for step in list(job["steps"]):
+                await self._steps[step](job, channel)
+                result = await jobs.update_one(
+                    owned,
+                    {"$pull": {"steps": step}, "$set": {"leaseUntil": datetime.utcnow() + CLOSE_JOB_LEASE}}
+                )
+                if not result.matched_count:
+                    print(f"[CloseJobs] ⚠️ Lost the lease on {job['_id']} after {step}; leaving it to the new owner.")
+                    return
+            await jobs.delete_one(owned)
+            print(f"[CloseJobs] ✅ {job['_id']} done.")
+        except Exception as e:
+            error = f"{step}: {e}"
+            now = datetime.utcnow()
+            if job["attempts"] >= CLOSE_JOB_MAX_ATTEMPTS:
+                await jobs.update_one(owned, {"$set": {"status": "failed", "lastError": error}})
+                print(f"[CloseJobs] ❌ {job['_id']} failed for good ({error})")
+                if channel and step != "channel":
+                    try:
+                        await channel.send(f"❌ Closing this ticket failed at **{step}**: {e}\nAn admin will need to finish it.")
+                    except Exception:
+                        pass
+            else:
+                delay = RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+                await jobs.update_one(
+                    owned,
+                    {"$set": {"status": "pending", "lastError": error,
+                              "runAt": now + timedelta(seconds=delay), "leaseUntil": now}}
+                )
+                print(f"[CloseJobs] ⚠️ {job['_id']} attempt {job['attempts']} failed ({error}); retrying in {delay}s")
+        finally:
+            heartbeat.cancel()
+
+    async def _get_channel(self, channel_id: int) -> discord.TextChannel | None:
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            try:
+                channel = await self.bot.fetch_channel(channel_id)
+            except discord.NotFound:
+                return None
+        return channel
+
+    # ------------------------- Steps -------------------------
+    async def _step_transcript(self, job: dict, channel):
+        if channel is None:
+            print(f"[CloseJobs] Channel {job['channelId']} is gone; skipping transcript.")
+            return
+        transcript_cog = self.bot.get_cog("Transcripts")
+        if transcript_cog:
+            await transcript_cog.generate_transcript(None, channel)
+
+    async def _step_points(self, job: dict, channel):
+        # Idempotent per ticket, so a retried step (or the Log Points button) can't double-credit
+        credited, _ = await points.credit_ticket(job["channelId"], job["users"])
+        if credited:
+            boards.mark_dirty(boards.CLIENTS)
+
+    async def _step_middleman(self, job: dict, channel):
+        if job.get("claimedBy"):
+            # Keyed by job ID: resuming after a crash between the credit and the
+            # step's $pull doesn't count the trade twice
+            run_key = f"{job['_id']}:{job['runId']}" if job.get("runId") else job["_id"]
+            await quota_service.credit_middleman(job["claimedBy"], job_id=run_key)
+
+    async def _step_boards(self, job: dict, channel):
+        # Coalesced: many closes in a short window cause one edit per board
+        boards.mark_dirty(boards.QUOTA, boards.MIDDLEMEN)
+
+    async def _step_ticket(self, job: dict, channel):
+        channel_id = int(job["channelId"])
+        colls = await collections()
+        await colls["tickets"].delete_one({"channelId": job["channelId"]})
+        ticket_registry.remove_ticket(channel_id)
+        await vouch_state.forget(channel_id)
+
+    async def _step_channel(self, job: dict, channel):
+        if channel is not None:
+            try:
+                await channel.delete(reason="Vouch confirmed by MM/Admin")
+            except discord.NotFound:
+                pass
+
+    # ------------------------- Admin -------------------------
+    @commands.command(name="closejobs")
+    @commands.has_permissions(administrator=True)
+    async def close_jobs_cmd(self, ctx: commands.Context):
+        """Shows queued and failed ticket-close jobs."""
+        colls = await collections()
+        docs = await colls["closeJobs"].find().sort("runAt", 1).limit(15).to_list(length=15)
+        if not docs:
+            return await ctx.reply("✅ No close jobs queued.", mention_author=False)
+        lines = [
+            f"`{d['_id']}` — **{d['status']}** (attempt {d['attempts']}) next: {', '.join(d['steps']) or '—'}"
+            + (f"\n> {d['lastError'][:150]}" if d.get("lastError") else "")
+            for d in docs
+        ]
+        await ctx.reply("\n".join(lines)[:1990], mention_author=False)
+
+    @commands.command(name="retryclosejob")
+    @commands.has_permissions(administrator=True)
+    async def retry_close_job(self, ctx: commands.Context, job_id: str):
+        """Requeues a failed close job from its first unfinished step."""
+        colls = await collections()
+        now = datetime.utcnow()
+        result = await colls["closeJobs"].update_one(
+            {"_id": job_id, "status": "failed"},
+            {"$set": {"status": "pending", "attempts": 0, "runAt": now, "leaseUntil": now}}
+        )
+        if result.modified_count:
+            self._wake.set()
+            await ctx.reply(f"🔁 Requeued `{job_id}`.", mention_author=False)
+        else:
+            await ctx.reply(f"❌ No failed job `{job_id}`.", mention_author=False)
+
+
+# -------------------------
+# Cog setup
+# -------------------------
+async def setup(bot):
+    await bot.add_cog(CloseJobs(bot))
@@ -0,0 +1,35 @@
+import discord
+from discord.ext import commands
+from utils import dispatch
+
+
+class DispatchStats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # ------------------------- Message handler latency -------------------------
+    @commands.command(name="dispatchstats", aliases=["listenerstats"])
+    @commands.has_permissions(administrator=True)
+    async def dispatch_stats(self, ctx: commands.Context, action: str = None):
+        """Shows per-handler message latency (`$dispatchstats reset` clears it)."""
+        if action == "reset":
+            dispatch.reset_stats()
+            return await ctx.reply("✅ Dispatch stats reset.", mention_author=False)
+
+        rows = dispatch.stats()
+        if not rows:
+            return await ctx.reply("⚠️ No message handlers subscribed.", mention_author=False)
+        lines = []
+        for name, s in rows:
+            avg = s["total_ms"] / s["calls"] if s["calls"] else 0.0
+            lines.append(
+                f"`{name}` — **{s['calls']}** calls | avg **{avg:.1f}ms** | max {s['max_ms']:.1f}ms"
+                f" | last {s['last_ms']:.1f}ms | errors {s['errors']}"
+            )
+        embed = discord.Embed(title="Message handlers", description="\n".join(lines), color=0x000000)
+        embed.set_footer(text="Slowest average first")
+        await ctx.reply(embed=embed, mention_author=False)
+
+
+async def setup(bot):
+    await bot.add_cog(DispatchStats(bot))
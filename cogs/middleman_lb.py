@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 from utils.db import collections
+from utils import boards, board_cards, avatar_cache, leaderboards
 from datetime import datetime
 
 # optional: constant for your leaderboard channel
@@ -9,25 +10,41 @@ LB_CHANNEL_ID = 1409663820053483642  # change to your actual leaderboard channel
 class MiddlemanLeaderboard(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._last_card: dict[int, str] = {}   # guild ID -> spec key of the card on the board now
+        boards.register(boards.MIDDLEMEN, self.refresh_all)
+
+    def cog_unload(self):
+        boards.unregister(boards.MIDDLEMEN)
+
+    async def refresh_all(self):
+        """Scheduler entry point: rebuilds the leaderboard in every guild."""
+        for guild in self.bot.guilds:
+            await self.update_or_create_lb(guild, force=False)
 
     # ------------------------- UPDATE OR CREATE MIDDLEMAN LB -------------------------
-    async def update_or_create_lb(self, guild: discord.Guild):
-        """Finds an existing middleman leaderboard message or creates one."""
+    async def update_or_create_lb(self, guild: discord.Guild, force: bool = True):
+        """
+        Finds an existing middleman leaderboard message or creates one.
+        With force=False nothing is sent when the board's data hasn't changed.
+        """
+        lb_channel = guild.get_channel(LB_CHANNEL_ID)
+        if not lb_channel:
+            print("[MM-LB] ❌ Leaderboard channel not found.")
+            return None
+
         try:
-            colls = await collections()
-            mm_coll = colls["middlemen"]
+            # Top 10 MMs from the in-memory leaderboard (seeded once, then kept current)
+            rows = await leaderboards.middlemen.top()
         except Exception as e:
             print(f"[MM-LB] DB error: {e}")
             return None
 
-        # Fetch top 10 MMs
-        docs = await mm_coll.find().sort("completed", -1).limit(10).to_list(length=10)
-        if not docs:
+        if not rows:
             desc = "*No middleman data yet.*"
         else:
             lines = [
-                f"**#{i+1}** <@{mm['_id']}> — **{mm.get('completed', 0)}** ticket{'s' if mm.get('completed', 0) != 1 else ''}"
-                for i, mm in enumerate(docs)
+                f"**#{i+1}** <@{mm_id}> — **{completed}** ticket{'s' if completed != 1 else ''}"
+                for i, (mm_id, completed) in enumerate(rows)
             ]
             desc = "\n".join(lines)
 
@@ -39,22 +56,41 @@ class MiddlemanLeaderboard(commands.Cog):
         )
         embed.set_footer(text="Middleman leaderboard — auto updates on ticket close")
 
-        lb_channel = guild.get_channel(LB_CHANNEL_ID)
-        if not lb_channel:
-            print("[MM-LB] ❌ Leaderboard channel not found.")
-            return None
+        digests, avatars = await avatar_cache.for_members(guild, [mm_id for mm_id, _ in rows], board_cards.AVATAR)
+        spec = {
+            "title": "MIDDLEMAN LEADERBOARD",
+            "subtitle": "Top middlemen by completed tickets",
+            "footer": "Auto updates on ticket close",
+            "empty": "No middleman data yet.",
+            "rows": [
+                {
+                    "rank": i + 1,
+                    "name": boards.member_name(guild, mm_id),
+                    "value": f"{completed} ticket{'s' if completed != 1 else ''}",
+                    "progress": None,
+                    "avatar": digests.get(mm_id),
+                }
+                for i, (mm_id, completed) in enumerate(rows)
+            ],
+        }
+        key = board_cards.spec_key(spec)
+        if not force and self._last_card.get(guild.id) == key:
+            return None  # Board already shows this data
 
-        # Try to find existing leaderboard message in the last few messages
-        async for msg in lb_channel.history(limit=20):
-            if msg.embeds and msg.embeds[0].title and "MIDDLEMAN LEADERBOARD" in msg.embeds[0].title:
-                await msg.edit(embed=embed)
-                print("[MM-LB] ✅ Updated existing leaderboard message.")
-                return msg
+        # Drawn as an image (text stays as the fallback)
+        files = await boards.attach_card(embed, spec, "middlemen.png", avatars)
+        if files:
+            embed.description = None
 
-        # If no existing LB found, send a new one
-        new_msg = await lb_channel.send(embed=embed)
-        print("[MM-LB] 🆕 Sent new leaderboard message.")
-        return new_msg
+        # Registry lookup → one edit; history is only scanned the first time
+        msg, created = await boards.publish(
+            lb_channel, boards.MIDDLEMEN,
+            lambda m: bool(m.embeds and m.embeds[0].title and "MIDDLEMAN LEADERBOARD" in m.embeds[0].title),
+            embed=embed, files=files or []
+        )
+        self._last_card[guild.id] = key
+        print(f"[MM-LB] {'🆕 Sent new' if created else '✅ Updated existing'} leaderboard message.")
+        return msg
 
     # ------------------------- MIDDLEMAN LEADERBOARD COMMAND -------------------------
     @commands.command(name="mmlb", aliases=["middlemanlb", "mmlboard"])
@@ -82,6 +118,7 @@ class MiddlemanLeaderboard(commands.Cog):
 
         try:
             result = await mm_coll.update_many({}, {"$set": {"completed": 0}})
+            leaderboards.middlemen.invalidate()
             modified = getattr(result, "modified_count", 0)
             await ctx.reply(f"✅ Reset {modified} middlemen stats to 0.", mention_author=False)
 
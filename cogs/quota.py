@@ -1,7 +1,8 @@
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime
+from datetime import datetime, time, timezone
 from utils.db import collections
+from utils import boards, board_cards, avatar_cache, quota_service
 
 # -------------------------
 # CONFIG
@@ -13,135 +14,172 @@ QUOTA_CHANNEL_ID = 1429161206467268609
 class Quota(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self._quota_data: dict[int, dict] | None = None   # weeklyQuota, keyed by MM ID
+        self._quota_version = -1                           # quota_service.version() it was loaded at
+        self._last_rendered = None                         # (channel, week, rows) on the board now
         self.reset_weekly_quota.start()
+        boards.register(boards.QUOTA, self.update_quota_board)
 
     def cog_unload(self):
         self.reset_weekly_quota.cancel()
+        boards.unregister(boards.QUOTA)
 
     # ------------------------- AUTO RESET -------------------------
-    @tasks.loop(hours=24)
+    async def _rollover(self):
+        week, modified = await quota_service.rollover_week()
+        print(f"✅ [Quota Reset] Week {week} processed ({modified} reset).")
+        # Nothing stale → the board is already correct
+        if modified:
+            boards.mark_dirty(boards.QUOTA)
+
+    @tasks.loop(time=time(hour=0, minute=0, tzinfo=timezone.utc))
     async def reset_weekly_quota(self):
+        # Fires daily at 00:00 UTC; the ISO week only changes on Monday
+        if datetime.now(timezone.utc).weekday() != 0:
+            return
         try:
-            colls = await collections()
-            quota_coll = colls["weeklyQuota"]
-            all_mms = await quota_coll.find().to_list(length=None)
-            if not all_mms:
-                return
-
-            current_week = datetime.utcnow().isocalendar()[1]
-            for mm in all_mms:
-                if mm.get("week") != current_week:
-                    await quota_coll.update_one(
-                        {"_id": mm["_id"]},
-                        {"$set": {"completed": 0, "week": current_week}}
-                    )
-            print(f"✅ [Quota Reset] Week {current_week} processed.")
-
-            # Update quota board after reset
-            await self.update_quota_board()
-
+            await self._rollover()
         except Exception as e:
             print(f"[Quota Reset Error] {e}")
 
     @reset_weekly_quota.before_loop
     async def before_reset(self):
         await self.bot.wait_until_ready()
+        # Catch up on a Monday that passed while the bot was offline
+        try:
+            await self._rollover()
+        except Exception as e:
+            print(f"[Quota Reset Error] {e}")
 
-    # ------------------------- INTERNAL METHOD -------------------------
-    async def _generate_quota_embed(self):
-        """Generates a quota embed without sending it."""
-        embed = None
-        for guild in self.bot.guilds:
+    # ------------------------- VIEW MODEL -------------------------
+    async def _load_quota(self) -> dict[int, dict]:
+        """mm_id -> quota doc. Re-read from Mongo only after quota_service reports a write."""
+        version = quota_service.version()
+        if self._quota_data is None or self._quota_version != version:
             colls = await collections()
-            quota_coll = colls["weeklyQuota"]
-
-            mm_role = guild.get_role(MIDDLEMAN_ROLE_ID)
-            if not mm_role:
+            docs = await colls["weeklyQuota"].find({}, {"completed": 1, "week": 1}).to_list(length=None)
+            self._quota_data = {int(doc["_id"]): doc for doc in docs}
+            self._quota_version = version
+        return self._quota_data
+
+    def _build_rows(self, guild: discord.Guild, db_data: dict, current_week: int) -> tuple | None:
+        """(member_id, completed) for every middleman in the guild, best first."""
+        mm_role = guild.get_role(MIDDLEMAN_ROLE_ID)
+        if not mm_role:
+            return None
+
+        mm_progress = []
+        for member in mm_role.members:
+            if member.bot:
                 continue
+            db_mm = db_data.get(member.id)
+            completed = 0
+            if db_mm and db_mm.get("week") == current_week:
+                completed = db_mm.get("completed", 0)
+            mm_progress.append((member.id, completed))
 
-            role_members = [m for m in mm_role.members if not m.bot]
-            all_mms = await quota_coll.find().to_list(length=None)
-            db_data = {int(mm["_id"]): mm for mm in all_mms}
-
-            current_week = datetime.utcnow().isocalendar()[1]
-            mm_progress = []
-            for member in role_members:
-                db_mm = db_data.get(member.id)
-                completed = 0
-                if db_mm:
-                    completed = db_mm.get("completed", 0)
-                    if db_mm.get("week") != current_week:
-                        completed = 0
-
-                mm_progress.append({
-                    "id": member.id,
-                    "name": member.display_name,
-                    "completed": completed
-                })
-
-            mm_progress.sort(key=lambda x: x["completed"], reverse=True)
-            completed_quota = [m for m in mm_progress if m["completed"] >= WEEKLY_QUOTA]
-            incomplete_quota = [m for m in mm_progress if m["completed"] < WEEKLY_QUOTA]
-
-            embed = discord.Embed(
-                title="**WEEKLY MIDDLEMEN QUOTA**",
-                description=(
-                    f"**Weekly Goal:** {WEEKLY_QUOTA} trades per middleman\n"
-                    f"**Current Week:** {current_week}\n\n"
-                    f"__**Completed Quota:**__\n"
-                    + (
-                        "\n".join([
-                            f"**#{i+1}** <@{mm['id']}> — **{mm['completed']} tickets**"
-                            for i, mm in enumerate(completed_quota)
-                        ]) if completed_quota else "*No middlemen have met their quota yet.*"
-                    )
-                    + "\n\n__**Incomplete Quota:**__\n"
-                    + (
-                        "\n".join([
-                            f"**#{i+1+len(completed_quota)}** <@{mm['id']}> — **{mm['completed']} / {WEEKLY_QUOTA}**"
-                            for i, mm in enumerate(incomplete_quota)
-                        ]) if incomplete_quota else "*Everyone has met the quota!*"
-                    )
-                ),
-                color=discord.Color.from_str("#2B2D31")
-            )
-            embed.set_footer(
-                text="Weekly middleman progress — auto resets every Monday",
-                icon_url=self.bot.user.display_avatar.url
-            )
-            embed.timestamp = datetime.utcnow()
+        mm_progress.sort(key=lambda x: x[1], reverse=True)
+        return tuple(mm_progress)
 
+    # ------------------------- INTERNAL METHOD -------------------------
+    def _generate_quota_embed(self, rows: tuple, current_week: int) -> discord.Embed:
+        """Generates a quota embed without sending it."""
+        completed_quota = [r for r in rows if r[1] >= WEEKLY_QUOTA]
+        incomplete_quota = [r for r in rows if r[1] < WEEKLY_QUOTA]
+
+        embed = discord.Embed(
+            title="**WEEKLY MIDDLEMEN QUOTA**",
+            description=(
+                f"**Weekly Goal:** {WEEKLY_QUOTA} trades per middleman\n"
+                f"**Current Week:** {current_week}\n\n"
+                f"__**Completed Quota:**__\n"
+                + (
+                    "\n".join([
+                        f"**#{i+1}** <@{mm_id}> — **{completed} tickets**"
+                        for i, (mm_id, completed) in enumerate(completed_quota)
+                    ]) if completed_quota else "*No middlemen have met their quota yet.*"
+                )
+                + "\n\n__**Incomplete Quota:**__\n"
+                + (
+                    "\n".join([
+                        f"**#{i+1+len(completed_quota)}** <@{mm_id}> — **{completed} / {WEEKLY_QUOTA}**"
+                        for i, (mm_id, completed) in enumerate(incomplete_quota)
+                    ]) if incomplete_quota else "*Everyone has met the quota!*"
+                )
+            ),
+            color=discord.Color.from_str("#2B2D31")
+        )
+        embed.set_footer(
+            text="Weekly middleman progress — auto resets every Monday",
+            icon_url=self.bot.user.display_avatar.url
+        )
+        embed.timestamp = datetime.utcnow()
         return embed
 
+    def _quota_card(self, guild: discord.Guild, rows: tuple, current_week: int, avatars: dict) -> dict:
+        """Plain-data spec for the PNG card (see utils/board_cards.py)."""
+        return {
+            "title": "WEEKLY MIDDLEMEN QUOTA",
+            "subtitle": f"Goal: {WEEKLY_QUOTA} trades per middleman · Week {current_week}",
+            "footer": "Weekly middleman progress — auto resets every Monday",
+            "empty": "No middlemen yet.",
+            "rows": [
+                {
+                    "rank": i + 1,
+                    "name": boards.member_name(guild, mm_id),
+                    "value": f"{completed} / {WEEKLY_QUOTA}",
+                    "progress": completed / WEEKLY_QUOTA,
+                    "done": completed >= WEEKLY_QUOTA,
+                    "avatar": avatars.get(mm_id),
+                }
+                for i, (mm_id, completed) in enumerate(rows)
+            ],
+        }
+
     # ------------------------- UPDATE QUOTA BOARD -------------------------
-    async def update_quota_board(self):
+    async def update_quota_board(self, force: bool = False):
         """Updates existing quota embed, or sends a new one if none exists."""
         channel = self.bot.get_channel(QUOTA_CHANNEL_ID)
         if not channel:
             print(f"[Quota Update] Channel with ID {QUOTA_CHANNEL_ID} not found!")
             return
 
-        embed = await self._generate_quota_embed()
-        if not embed:
+        # Only the guild that hosts the quota channel is rendered
+        current_week = quota_service.current_week()
+        rows = self._build_rows(channel.guild, await self._load_quota(), current_week)
+        if rows is None:
             return
 
-        # Try to find existing embed
-        quota_msg = None
-        async for msg in channel.history(limit=50):
-            if msg.author == self.bot.user and msg.embeds:
-                if "WEEKLY MIDDLEMEN QUOTA" in msg.embeds[0].title:
-                    quota_msg = msg
-                    break
+        rendered = (channel.id, current_week, rows)
+        if not force and rendered == self._last_rendered:
+            return  # Same rows as the message already shows
+
+        embed = self._generate_quota_embed(rows, current_week)
+        # Drawn as an image so the board never hits the embed length limit; text is the fallback
+        digests, avatars = await avatar_cache.for_members(channel.guild, [mm_id for mm_id, _ in rows], board_cards.AVATAR)
+        spec = self._quota_card(channel.guild, rows, current_week, digests)
+        files = await boards.attach_card(embed, spec, "quota.png", avatars)
+        if files:
+            met = sum(1 for _, completed in rows if completed >= WEEKLY_QUOTA)
+            embed.description = (
+                f"**Weekly Goal:** {WEEKLY_QUOTA} trades per middleman\n"
+                f"**Current Week:** {current_week}\n"
+                f"**Met Quota:** {met} / {len(rows)}"
+            )
 
-        if quota_msg:
-            await quota_msg.edit(embed=embed)
-        else:
-            await channel.send(embed=embed)
+        # Registry lookup → one edit; history is only scanned the first time
+        await boards.publish(
+            channel, boards.QUOTA,
+            lambda m: m.author == self.bot.user and bool(m.embeds)
+            and "WEEKLY MIDDLEMEN QUOTA" in (m.embeds[0].title or ""),
+            embed=embed, files=files or []
+        )
+        self._last_rendered = rendered
 
     # ------------------------- COMMAND -------------------------
     @commands.command(name="quota", aliases=["quotaboard", "qboard"])
     async def quota_command(self, ctx: commands.Context):
-        await self.update_quota_board()
+        await self.update_quota_board(force=True)
 
     # ------------------------- SEND QUOTA ON STARTUP -------------------------
     async def send_quota_on_startup(self):
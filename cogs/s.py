@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
-import aiohttp
 from utils.db import collections
+from utils import roblox
 
 class SaveCommand(commands.Cog):
     def __init__(self, bot):
@@ -9,37 +9,10 @@ class SaveCommand(commands.Cog):
 
     async def get_roblox_user(self, query: str):
         """Resolve username or ID into Roblox user object, or None if not found."""
-        query = query.strip()
-
-        # If numeric, treat as ID
-        if query.isdigit():
-            user_id = int(query)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"https://users.roblox.com/v1/users/{user_id}") as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    return None
-
-        # Otherwise treat as username
-        async with aiohttp.ClientSession() as session:
-            url = "https://users.roblox.com/v1/usernames/users"
-            payload = {"usernames": [query], "excludeBannedUsers": False}
-
-            async with session.post(url, json=payload) as resp:
-                if resp.status != 200:
-                    return None
-                data = await resp.json()
-
-                if not data.get("data") or len(data["data"]) == 0:
-                    return None
-
-                user_id = data["data"][0]["id"]
-
-            # Fetch user details
-            async with session.get(f"https://users.roblox.com/v1/users/{user_id}") as resp:
-                if resp.status == 200:
-                    return await resp.json()
-                return None
+        user_id = await roblox.resolve_user_id(query)
+        if not user_id:
+            return None
+        return await roblox.get_profile(user_id)
 
     @commands.command(name="s", aliases=["save"], help="Save your Roblox username/ID.")
     async def save(self, ctx, *, roblox_user: str):
@@ -1,32 +1,181 @@
+import os
+import asyncio
 from discord.ext import commands
 import discord
+from utils.db import collections
+from utils import dispatch
+
+# -------------------------
+# CONFIG
+# -------------------------
+# A sticky is reposted at most once per window per channel, however busy the
+# channel is: messages inside the window are coalesced into a single repost.
+STICKY_REPOST_SECONDS = float(os.getenv("STICKY_REPOST_SECONDS", "5"))
+
 
 class Sticky(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.sticky_map: dict[int, dict] = {}  # channel_id -> {message:str, message_id:int}
+        # channel_id -> {"guild_id": int, "message": str, "message_id": int | None}
+        self.sticky_map: dict[int, dict] = {}
+        # channel_id -> the sticky currently in the channel (no fetch needed to delete it)
+        self._current: dict[int, discord.abc.Snowflake] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._pending: dict[int, asyncio.Task] = {}
+        self._dirty: set[int] = set()
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        # Every channel until the stickies are loaded, then only sticky channels
+        dispatch.subscribe("sticky", self.handle_message, everywhere=True)
+
+    def cog_unload(self):
+        dispatch.unsubscribe("sticky")
+        for task in self._pending.values():
+            task.cancel()
+
+    def _subscribe(self):
+        dispatch.subscribe("sticky", self.handle_message, channels=self.sticky_map)
+
+    # ------------------------- Storage -------------------------
+    async def _ensure_loaded(self):
+        """Loads every sticky from the stickyMessages collection once."""
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            colls = await collections()
+            async for doc in colls["stickyMessages"].find():
+                self.sticky_map[int(doc["_id"])] = {
+                    "guild_id": int(doc["guildId"]),
+                    "message": doc["message"],
+                    "message_id": int(doc["messageId"]) if doc.get("messageId") else None,
+                }
+            self._loaded = True
+            self._subscribe()
+            print(f"[Sticky] Loaded {len(self.sticky_map)} sticky messages.")
+
+    async def _save_message_id(self, channel_id: int, message_id: int):
+        colls = await collections()
+        await colls["stickyMessages"].update_one(
+            {"_id": str(channel_id)}, {"$set": {"messageId": str(message_id)}}
+        )
+
+    def _lock(self, channel_id: int) -> asyncio.Lock:
+        lock = self._locks.get(channel_id)
+        if lock is None:
+            lock = self._locks[channel_id] = asyncio.Lock()
+        return lock
 
+    # ------------------------- Repost -------------------------
+    async def _delete_current(self, channel: discord.TextChannel):
+        data = self.sticky_map.get(channel.id)
+        old = self._current.pop(channel.id, None)
+        if old is None and data and data.get("message_id"):
+            # After a restart only the ID is known; a partial message deletes without a fetch
+            old = channel.get_partial_message(data["message_id"])
+        if old is None:
+            return
+        try:
+            await old.delete()
+        except (discord.NotFound, discord.Forbidden):
+            pass
+
+    async def _repost(self, channel: discord.TextChannel):
+        """Replaces the sticky at the bottom of the channel. Caller holds the channel lock."""
+        data = self.sticky_map.get(channel.id)
+        if not data:
+            return
+        await self._delete_current(channel)
+        sent = await channel.send(data["message"])
+        self._current[channel.id] = sent
+        data["message_id"] = sent.id
+        await self._save_message_id(channel.id, sent.id)
+
+    async def _repost_loop(self, channel: discord.TextChannel):
+        """
+        Runs while the channel has unanswered messages: wait out the window,
+        then repost once for everything that arrived meanwhile.
+        """
+        try:
+            while channel.id in self._dirty:
+                await asyncio.sleep(STICKY_REPOST_SECONDS)
+                self._dirty.discard(channel.id)
+                async with self._lock(channel.id):
+                    try:
+                        await self._repost(channel)
+                    except discord.HTTPException as e:
+                        print(f"[Sticky] ❌ Repost failed in #{channel} ({channel.id}): {e}")
+        finally:
+            self._pending.pop(channel.id, None)
+
+    def _schedule(self, channel: discord.TextChannel):
+        self._dirty.add(channel.id)
+        if channel.id not in self._pending:
+            self._pending[channel.id] = asyncio.create_task(self._repost_loop(channel))
+
+    # ------------------------- Commands -------------------------
     @commands.command(name="setsticky")
     @commands.has_permissions(manage_messages=True)
     async def setsticky(self, ctx: commands.Context, channel: discord.TextChannel, *, message: str):
-        sent = await channel.send(message)
-        self.sticky_map[channel.id] = {"message": message, "message_id": sent.id}
+        await self._ensure_loaded()
+        async with self._lock(channel.id):
+            await self._delete_current(channel)
+            sent = await channel.send(message)
+            self._current[channel.id] = sent
+            self.sticky_map[channel.id] = {"guild_id": channel.guild.id, "message": message, "message_id": sent.id}
+            colls = await collections()
+            await colls["stickyMessages"].update_one(
+                {"_id": str(channel.id)},
+                {"$set": {"guildId": str(channel.guild.id), "message": message, "messageId": str(sent.id)}},
+                upsert=True
+            )
+            self._subscribe()
         await ctx.reply(f"✅ Sticky message set in {channel.mention}", mention_author=False)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not isinstance(message.channel, discord.TextChannel):
+    @commands.command(name="unsticky", aliases=["removesticky"])
+    @commands.has_permissions(manage_messages=True)
+    async def unsticky(self, ctx: commands.Context, channel: discord.TextChannel = None):
+        channel = channel or ctx.channel
+        await self._ensure_loaded()
+        if channel.id not in self.sticky_map:
+            return await ctx.reply(f"⚠️ {channel.mention} has no sticky message.", mention_author=False)
+        async with self._lock(channel.id):
+            self._dirty.discard(channel.id)
+            task = self._pending.pop(channel.id, None)
+            if task:
+                task.cancel()
+            await self._delete_current(channel)
+            self.sticky_map.pop(channel.id, None)
+            self._subscribe()
+            colls = await collections()
+            await colls["stickyMessages"].delete_one({"_id": str(channel.id)})
+        await ctx.reply(f"✅ Sticky message removed from {channel.mention}", mention_author=False)
+
+    # ------------------------- Listeners -------------------------
+    async def handle_message(self, message: discord.Message):
+        """Routed by utils/dispatch.py (non-bot messages in sticky channels)."""
+        if not isinstance(message.channel, discord.TextChannel):
             return
-        data = self.sticky_map.get(message.channel.id)
-        if not data:
+        await self._ensure_loaded()
+        if message.channel.id in self.sticky_map:
+            self._schedule(message.channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if channel.id not in self.sticky_map:
             return
-        try:
-            old = await message.channel.fetch_message(data["message_id"])
-            await old.delete()
-        except Exception:
-            pass
-        new_msg = await message.channel.send(data["message"])
-        self.sticky_map[message.channel.id]["message_id"] = new_msg.id
+        self._dirty.discard(channel.id)
+        task = self._pending.pop(channel.id, None)
+        if task:
+            task.cancel()
+        self.sticky_map.pop(channel.id, None)
+        self._subscribe()
+        self._current.pop(channel.id, None)
+        self._locks.pop(channel.id, None)
+        colls = await collections()
+        await colls["stickyMessages"].delete_one({"_id": str(channel.id)})
+
 
 async def setup(bot):
-    await bot.add_cog(Sticky(bot))
\ No newline at end of file
+    await bot.add_cog(Sticky(bot))
@@ -1,8 +1,8 @@
-import os
 import discord
 from discord.ext import commands
 from utils.constants import TICKET_CATEGORY_ID, OWNER_ID
 from utils.db import collections
+from utils import leaderboards, boards
 
 ALLOWED_ROLE_ID = 1373029428409405500  # special staff role
 
@@ -73,14 +73,9 @@ class TicketCommands(commands.Cog):
 
         colls = await collections()
         await colls['clientPoints'].delete_many({})
-
-        try:
-            leaderboard_channel = ctx.guild.get_channel(int(os.getenv("LB_CHANNEL_ID")))
-            leaderboard_message = await leaderboard_channel.fetch_message(int(os.getenv("LB_MESSAGE_ID")))
-            embed = discord.Embed(title="🏆 Client Leaderboard", description="No points recorded yet!", color=0xFFD700)
-            await leaderboard_message.edit(embed=embed)
-        except:
-            pass
+        leaderboards.clients.invalidate()
+        # Redrawn by the board scheduler through the boards registry
+        boards.mark_dirty(boards.CLIENTS)
 
         await ctx.send("✅ Leaderboard has been reset.")
 
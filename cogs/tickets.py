@@ -3,20 +3,19 @@ import discord
 from discord.ext import commands
 from discord.ui import View, Button, Modal, TextInput
 from datetime import datetime
-from utils.constants import (
-    EMBED_COLOR, TICKET_CATEGORY_ID, MIDDLEMAN_ROLE_ID, OWNER_ID,
-    LB_CHANNEL_ID, LB_MESSAGE_ID
-)
+from utils.constants import EMBED_COLOR, TICKET_CATEGORY_ID, MIDDLEMAN_ROLE_ID, OWNER_ID
 from utils.db import collections
 from .crypto_buttons import CryptoButtonView
-from utils.ticket_stats import increment_ticket_count, get_ticket_count
+from utils.ticket_stats import increment_ticket_count, get_ticket_counts
+from utils import ticket_registry, roblox, boards, vouch_state, quota_service, points, avatar_cache
 
 # ------------------------- Helpers -------------------------
 PLACEHOLDER_AVATAR = "https://cdn.discordapp.com/embed/avatars/0.png"
 
 def _avatar_url(user: discord.abc.User, size: int = 1024) -> str:
     try:
-        return user.display_avatar.replace(size=size, format="png").url
+        # Bucketed size: the same CDN variant the avatar cache and cards use
+        return avatar_cache.avatar_url(user, size)
     except Exception:
         try:
             return user.display_avatar.with_static_format("png").url
@@ -108,6 +107,7 @@ class ClaimAndDeleteView(View):
             {"$set": {"claimedBy": str(member.id)}},
             upsert=True
         )
+        ticket_registry.set_claimed(ch.id, member.id)
 
         try:
             await ch.send(f"{member.mention} will be your middleman for this trade.")
@@ -126,7 +126,7 @@ class ClaimAndDeleteView(View):
             color=0x000000
         )
         try:
-            profile.set_thumbnail(url=member.display_avatar.url)
+            profile.set_thumbnail(url=_avatar_url(member, 256))
         except Exception:
             profile.set_thumbnail(url=PLACEHOLDER_AVATAR)
 
@@ -186,6 +186,10 @@ class ClaimView(discord.ui.View):
                 "❌ You don’t have permission to use this button.", ephemeral=True
             )
 
+        # Acknowledge first: the Roblox lookup may retry on 429s for longer than
+        # the 3 s interaction window allows
+        await interaction.response.defer(thinking=True)
+
         ch = interaction.channel
 
         colls = await collections()
@@ -196,51 +200,38 @@ class ClaimView(discord.ui.View):
         mm_id = ticket_doc.get("claimedBy") if ticket_doc else None
 
         if not mm_id:
-            return await interaction.response.send_message(
+            return await interaction.followup.send(
                 "❌ Could not find the middleman for this ticket.", ephemeral=True
             )
 
         user_doc = await users_coll.find_one({"_id": str(mm_id)})
         if not user_doc:
-            return await interaction.response.send_message(
+            return await interaction.followup.send(
                 "❌ No Roblox user saved for this middleman.", ephemeral=True
             )
 
         query = user_doc.get("robloxUser")
         if not query:
-            return await interaction.response.send_message(
+            return await interaction.followup.send(
                 "❌ No Roblox username found for this middleman.", ephemeral=True
             )
 
-        import aiohttp
-        roblox_data = None
         thumb_url = "https://www.roblox.com/images/logo/roblox_logo_300x300.png"
 
-        async with aiohttp.ClientSession() as session:
-            if not query.isdigit():
-                async with session.post(
-                    "https://users.roblox.com/v1/usernames/users",
-                    json={"usernames": [query], "excludeBannedUsers": False}
-                ) as resp:
-                    data = await resp.json()
-                    if data["data"]:
-                        roblox_id = data["data"][0]["id"]
-                    else:
-                        return await interaction.response.send_message(
-                            f"❌ Could not find Roblox user `{query}`.", ephemeral=True
-                        )
-            else:
-                roblox_id = int(query)
-
-            async with session.get(f"https://users.roblox.com/v1/users/{roblox_id}") as resp:
-                roblox_data = await resp.json()
+        roblox_id = await roblox.resolve_user_id(query)
+        if not roblox_id:
+            return await interaction.followup.send(
+                f"❌ Could not find Roblox user `{query}`.", ephemeral=True
+            )
 
-            async with session.get(
-                f"https://thumbnails.roblox.com/v1/users/avatar-headshot?userIds={roblox_id}&size=150x150&format=Png&isCircular=false"
-            ) as resp:
-                thumb_data = await resp.json()
-                if thumb_data["data"]:
-                    thumb_url = thumb_data["data"][0]["imageUrl"]
+        # Cached per middleman, so repeat presses in a ticket don't leave the process
+        bundle = await roblox.get_user_bundle(roblox_id)
+        roblox_data = bundle["profile"]
+        if not roblox_data:
+            return await interaction.followup.send(
+                "❌ Could not fetch the Roblox profile right now.", ephemeral=True
+            )
+        thumb_url = bundle["headshot"] or thumb_url
 
         profile_link = f"https://www.roblox.com/users/{roblox_id}/profile"
 
@@ -259,7 +250,7 @@ class ClaimView(discord.ui.View):
 
         row = discord.ui.View()
         row.add_item(discord.ui.Button(label="Profile Link", style=discord.ButtonStyle.link, url=profile_link))
-        await interaction.response.send_message(embed=embed, view=row)
+        await interaction.followup.send(embed=embed, view=row)
 
     # ---------------- LTC Button ----------------
     async def ltc_callback(self, interaction: discord.Interaction):
@@ -306,9 +297,10 @@ class ClaimView(discord.ui.View):
         await interaction.response.send_message(embed=embed)
 # ------------------------- Trade Embeds -------------------------
 async def send_trade_embed(ticket_channel, user1, user2, side1, side2, trade_desc):
-    count1 = get_ticket_count(user1.id)
-    count2 = get_ticket_count(user2.id) if user2 else 0
-    
+    counts = get_ticket_counts(*(u.id for u in (user1, user2) if u))
+    count1 = counts.get(user1.id, 0)
+    count2 = counts.get(user2.id, 0) if user2 else 0
+
     avatar1 = _avatar_url(user1) if user1 else PLACEHOLDER_AVATAR
     avatar2 = _avatar_url(user2) if user2 else PLACEHOLDER_AVATAR
 
@@ -391,7 +383,6 @@ class ClosePanel(View):
             channel = interaction.channel
             colls = await collections()
             tickets_coll = colls["tickets"]
-            points_coll = colls["clientPoints"]
     
             ticket_data = await tickets_coll.find_one({"channelId": str(channel.id)})
             if not ticket_data:
@@ -402,44 +393,12 @@ class ClosePanel(View):
             if not user_ids:
                 return await interaction.followup.send("❌ No users to log points for.", ephemeral=True)
     
-            # increment points (no points in $setOnInsert)
-            for uid in user_ids:
-                await points_coll.update_one(
-                    {"userId": uid},
-                    {"$inc": {"points": 1}, "$setOnInsert": {"userId": uid}},
-                    upsert=True
-                )
-    
-            # Update leaderboard (safe .get usage)
-            lb_channel = interaction.guild.get_channel(LB_CHANNEL_ID)
-            if lb_channel:
-                try:
-                    lb_message = await lb_channel.fetch_message(LB_MESSAGE_ID)
-                except Exception:
-                    embed = discord.Embed(
-                        title="🏆 Top Clients This Month",
-                        description="No data yet.",
-                        color=0x2B2D31,
-                        timestamp=datetime.utcnow()
-                    )
-                    embed.set_footer(text="Client Leaderboard")
-                    lb_message = await lb_channel.send(embed=embed)
-    
-                top_users = await points_coll.find().sort("points", -1).limit(10).to_list(length=10)
-                leaderboard_text = "\n".join(
-                    f"**#{i+1}** <@{user.get('userId')}> — **{user.get('points', 0)}** point{'s' if user.get('points', 0) != 1 else ''}"
-                    for i, user in enumerate(top_users)
-                    if user.get("userId")
-                ) or "No data yet."
-    
-                embed = discord.Embed(
-                    title="🏆 Top Clients This Month",
-                    description=leaderboard_text,
-                    color=0x2B2D31,
-                    timestamp=datetime.utcnow()
-                )
-                embed.set_footer(text="Client Leaderboard")
-                await lb_message.edit(embed=embed)
+            # One bulk write; a ticket can only ever be credited once
+            credited, _ = await points.credit_ticket(channel.id, user_ids)
+            if not credited:
+                return await interaction.followup.send("⚠️ Points were already logged for this ticket.", ephemeral=True)
+            # Leaderboard is re-rendered by the board scheduler (coalesced with other closes)
+            boards.mark_dirty(boards.CLIENTS)
     
             mentions = ", ".join(f"<@{uid}>" for uid in user_ids)
             await interaction.followup.send(f"✅ Logged 1 point for {mentions}.", ephemeral=True)
@@ -483,16 +442,28 @@ class TicketPanelView(View):
                 # ✅ Passed MM Ban check
                 await modal_interaction.response.defer(ephemeral=True)
 
+                user = modal_interaction.user
+                try:
+                    await ticket_registry.ensure_loaded()
+                    existing_id = ticket_registry.open_ticket_for(user.id)
+                    if existing_id and modal_interaction.guild.get_channel(existing_id) is None:
+                        # Channel vanished while the bot was offline; drop the stale entry
+                        ticket_registry.remove_ticket(existing_id)
+                        existing_id = ticket_registry.open_ticket_for(user.id)
+                    if existing_id:
+                        return await modal_interaction.followup.send(
+                            f"❌ You already have an open ticket: <#{existing_id}>", ephemeral=True
+                        )
+                    if not ticket_registry.reserve(user.id):
+                        return await modal_interaction.followup.send(
+                            "❌ Your ticket is already being created.", ephemeral=True
+                        )
+                except Exception as e:
+                    return await modal_interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
+
                 try:
                     colls = await collections()
                     cat = modal_interaction.guild.get_channel(TICKET_CATEGORY_ID)
-                    if cat:
-                        for ch in cat.channels:
-                            ow = ch.overwrites_for(modal_interaction.user)
-                            if ow.view_channel:
-                                return await modal_interaction.followup.send(
-                                    f"❌ You already have an open ticket: {ch.mention}", ephemeral=True
-                                )
 
                     q1v, q2v, q3v, q4v = str(self.q1), str(self.q2), str(self.q3), str(self.q4)
 
@@ -530,6 +501,7 @@ class TicketPanelView(View):
                         "user2": str(target_member.id) if target_member else None,
                         "createdAt": datetime.utcnow()
                     })
+                    ticket_registry.add_ticket(ticket.id, modal_interaction.user.id, target_member.id if target_member else None)
 
                     await send_trade_embed(ticket, modal_interaction.user, target_member, q2v, q3v, q1v)
                     # Track ticket creation count locally (not in Mongo)
@@ -541,6 +513,8 @@ class TicketPanelView(View):
 
                 except Exception as e:
                     await modal_interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
+                finally:
+                    ticket_registry.release(user.id)
 
         await interaction.response.send_modal(TicketModal())
 # ------------------------- Main Cog -------------------------
@@ -570,19 +544,16 @@ class Tickets(commands.Cog):
             color=EMBED_COLOR
         )
 
-        existing = None
-        async for msg in target.history(limit=50):
-            if msg.author.id == ctx.bot.user.id and msg.embeds:
-                if msg.embeds[0].title == "Azan's Middleman Service":
-                    existing = msg
-                    break
-
-        if existing:
-            await existing.edit(embed=embed, view=TicketPanelView())
-            await ctx.reply("🔁 Setup panel updated.", mention_author=False)
-        else:
-            await target.send(embed=embed, view=TicketPanelView())
+        _, created = await boards.publish(
+            target, boards.PANEL,
+            lambda m: m.author.id == ctx.bot.user.id and bool(m.embeds)
+            and m.embeds[0].title == "Azan's Middleman Service",
+            embed=embed, view=TicketPanelView()
+        )
+        if created:
             await ctx.reply("✅ Setup complete.", mention_author=False)
+        else:
+            await ctx.reply("🔁 Setup panel updated.", mention_author=False)
 
     @commands.command(name="close")
     async def close_ticket(self, ctx: commands.Context):
@@ -601,51 +572,21 @@ class Tickets(commands.Cog):
     
         colls = await collections()
         tickets_coll = colls["tickets"]
-        mm_coll = colls["middlemen"]
-        quota_coll = colls["weeklyQuota"]
     
         ticket_data = await tickets_coll.find_one({"channelId": str(ch.id)})
         claimed_by = ticket_data.get("claimedBy") if ticket_data else None
     
         if claimed_by:
-            try:
-                mm_id_for_db = int(claimed_by)
-            except Exception:
-                mm_id_for_db = claimed_by
-    
-            from datetime import datetime
-            current_week = datetime.utcnow().isocalendar()[1]
-    
-            # ------------------- Update Middleman Leaderboard -------------------
-            await mm_coll.update_one(
-                {"_id": mm_id_for_db},
-                {"$inc": {"completed": 1}, "$set": {"week": current_week}},
-                upsert=True
-            )
-    
-            # ------------------- Update Weekly Quota -------------------
-            quota_doc = await quota_coll.find_one({"_id": mm_id_for_db})
-            if quota_doc and quota_doc.get("week") == current_week:
-                await quota_coll.update_one(
-                    {"_id": mm_id_for_db},
-                    {"$inc": {"completed": 1}}
-                )
+            # ------------------- Update Middleman Leaderboard, Quota & Boards -------------------
+            # Queued: the panel shows immediately and the credit survives a restart
+            close_jobs = ctx.bot.get_cog("CloseJobs")
+            if close_jobs:
+                queued = await close_jobs.enqueue("close", ch, claimed_by=claimed_by, requested_by=ctx.author.id)
+                if not queued:
+                    await ctx.send("⚠️ This ticket's close is already being processed; the middleman won't be credited twice.")
             else:
-                await quota_coll.update_one(
-                    {"_id": mm_id_for_db},
-                    {"$set": {"completed": 1, "week": current_week}},
-                    upsert=True
-                )
-    
-            # ------------------- Refresh Boards -------------------
-            quota_cog = ctx.bot.get_cog("Quota")
-            if quota_cog:
-                await quota_cog.send_quota_on_startup()  # safe: only sends if none exists
-    
-            mm_lb_cog = ctx.bot.get_cog("MiddlemanLeaderboard")
-            if mm_lb_cog:
-                for guild in ctx.bot.guilds:
-                    await mm_lb_cog.update_or_create_lb(guild)
+                await quota_service.credit_middleman(claimed_by)
+                boards.mark_dirty(boards.QUOTA, boards.MIDDLEMEN)
     
         embed = discord.Embed(
             title="🔒 Ticket Closed",
@@ -660,7 +601,9 @@ class Tickets(commands.Cog):
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
         """Auto-clean Mongo when a ticket channel is deleted."""
+        ticket_registry.remove_ticket(channel.id)
         try:
+            await vouch_state.forget(channel.id)
             colls = await collections()
             tickets_coll = colls["tickets"]
             result = await tickets_coll.delete_one({"_id": str(channel.id)})
@@ -1,15 +1,78 @@
 import os
+import asyncio
+import secrets
+import functools
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 import discord
 from discord.ext import commands
 from utils.constants import BASE_URL, EMBED_COLOR, TRANSCRIPT_CHANNEL_ID
 from utils.db import collections
+from utils import transcript_store
 import chat_exporter
 
-def ensure_transcript_dir():
-    path = os.path.join(os.getcwd(), "transcripts")
-    os.makedirs(path, exist_ok=True)
-    return path
+# Disk I/O for transcripts runs here so long tickets never block the gateway
+TRANSCRIPT_WORKERS = int(os.getenv("TRANSCRIPT_WORKERS", "4"))
+# How many transcripts a single guild may generate at the same time
+TRANSCRIPT_GUILD_CONCURRENCY = int(os.getenv("TRANSCRIPT_GUILD_CONCURRENCY", "2"))
+# TXT lines buffered before a write is handed to the pool
+TXT_FLUSH_LINES = 500
+
+_io_pool = ThreadPoolExecutor(max_workers=TRANSCRIPT_WORKERS, thread_name_prefix="transcripts")
+_guild_slots: dict[int, asyncio.Semaphore] = {}
+
+async def run_io(fn, *args, **kwargs):
+    """Runs a blocking call in the transcript thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_io_pool, functools.partial(fn, *args, **kwargs))
+
+def _guild_slot(guild_id: int) -> asyncio.Semaphore:
+    slot = _guild_slots.get(guild_id)
+    if slot is None:
+        slot = _guild_slots[guild_id] = asyncio.Semaphore(TRANSCRIPT_GUILD_CONCURRENCY)
+    return slot
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _txt_line(m: discord.Message) -> str:
+    ts = m.created_at.isoformat()
+    content = m.clean_content or (
+        "[Embed]" if m.embeds else "[Attachment]" if m.attachments else ""
+    )
+    return f"[{ts}] {m.author}: {content}\n"
+
+class TranscriptStream:
+    """
+    Walks a channel's history once and feeds every message to the participant
+    counter, the TXT writer and the list handed to chat-exporter's renderer.
+    """
+    def __init__(self, channel: discord.TextChannel, txt_path: str):
+        self.channel = channel
+        self.txt_path = txt_path
+        self.participants = {}
+        self.messages = []
+
+    async def run(self):
+        txt_file = await run_io(open, self.txt_path, "w", encoding="utf-8")
+        try:
+            pending = []
+            async for m in self.channel.history(limit=None, oldest_first=True):
+                if not m.author.bot:
+                    self.participants[m.author.id] = self.participants.get(m.author.id, 0) + 1
+                pending.append(_txt_line(m))
+                self.messages.append(m)
+                if len(pending) >= TXT_FLUSH_LINES:
+                    await run_io(txt_file.writelines, pending)
+                    pending = []
+            if pending:
+                await run_io(txt_file.writelines, pending)
+        finally:
+            await run_io(txt_file.close)
+        return self
 
 class Transcripts(commands.Cog):
     def __init__(self, bot):
@@ -21,67 +84,64 @@ class Transcripts(commands.Cog):
             # not fatal — keep going
             pass
 
-    async def generate_transcript(self, interaction: discord.Interaction, channel: discord.TextChannel):
+    async def generate_transcript(self, interaction: discord.Interaction | None, channel: discord.TextChannel):
         """
         Generate a transcript using chat-exporter, store HTML on disk (served via BASE_URL),
         attach only the TXT file and send the embed+link to both the user and the transcript log channel.
+        At most TRANSCRIPT_GUILD_CONCURRENCY transcripts run per guild at once.
+        With interaction=None (background close jobs) only the log channel gets it and
+        failures are raised to the caller instead of being reported to a user.
         """
+        guild_id = channel.guild.id if getattr(channel, "guild", None) else 0
+        async with _guild_slot(guild_id):
+            await self._generate_transcript(interaction, channel)
+
+    async def _generate_transcript(self, interaction: discord.Interaction | None, channel: discord.TextChannel):
+        html_name = f"{channel.id}.html"
+        txt_name = f"transcript-{channel.id}.txt"
+        # TXT is spooled to a private file, attached from there, then stored compressed
+        txt_path = transcript_store.spool_path(f"{secrets.token_hex(8)}-{txt_name}")
         try:
             if not isinstance(channel, discord.TextChannel):
-                return await interaction.response.send_message("❌ Not a text channel.", ephemeral=True)
+                raise RuntimeError("Not a text channel.")
 
-            # Collect messages and participant stats
-            msgs = [m async for m in channel.history(limit=None, oldest_first=True)]
-            participants = {}
-            for m in msgs:
-                if not m.author.bot:
-                    participants[m.author.id] = participants.get(m.author.id, 0) + 1
+            # Single history pass: participant stats + TXT lines are written as messages arrive
+            stream = await TranscriptStream(channel, txt_path).run()
+            participants = stream.participants
 
-            # Generate HTML transcript via chat-exporter (returns HTML string)
-            transcript_html = await chat_exporter.export(
+            # Render HTML from the messages we already fetched (no second history walk)
+            transcript_html = await chat_exporter.raw_export(
                 channel,
-                limit=None,
+                messages=stream.messages,
                 tz_info="UTC",
                 military_time=True,
                 bot=self.bot
             )
 
             if transcript_html is None:
-                return await interaction.response.send_message("❌ Could not generate transcript.", ephemeral=True)
-
-            folder = ensure_transcript_dir()
-            html_name = f"{channel.id}.html"
-            txt_name = f"transcript-{channel.id}.txt"
+                raise RuntimeError("Could not generate transcript.")
 
-            # Save HTML on disk (so BASE_URL link can point to it)
-            html_path = os.path.join(folder, html_name)
+            # Store HTML + TXT compressed and content-addressed (served via BASE_URL)
+            html_digest = None
             try:
-                with open(html_path, "w", encoding="utf-8") as f:
-                    f.write(transcript_html)
+                html_digest = await run_io(
+                    transcript_store.put_html, html_name, transcript_html, f"{BASE_URL}/transcripts/assets"
+                )
+                await run_io(transcript_store.put_file, txt_name, txt_path, "text/plain; charset=utf-8")
             except Exception as e:
-                # log but continue (we can still provide the html string as link if your server serves it)
-                print(f"❌ Failed to write HTML transcript to disk: {e}")
-
-            # Save text version (attachable)
-            txt_path = os.path.join(folder, txt_name)
-            with open(txt_path, "w", encoding="utf-8") as f:
-                for m in msgs:
-                    ts = m.created_at.isoformat()
-                    content = m.clean_content or (
-                        "[Embed]" if m.embeds else "[Attachment]" if m.attachments else ""
-                    )
-                    f.write(f"[{ts}] {m.author}: {content}\n")
-
-            # Save record in DB
+                # log but continue (the TXT attachment is still sent from the spool file)
+                print(f"❌ Failed to write transcript to the store: {e}")
+
+            # Save record in DB (Motor collections can't be truth-tested, so no guard here)
             try:
                 colls = await collections()
-                if colls and colls.get("transcripts"):
-                    await colls["transcripts"].insert_one({
-                        "channelId": str(channel.id),
-                        "channelName": channel.name,
-                        "participants": [{"userId": str(uid), "count": c} for uid, c in participants.items()],
-                        "createdAt": dt.datetime.utcnow(),
-                    })
+                await colls["transcripts"].insert_one({
+                    "channelId": str(channel.id),
+                    "channelName": channel.name,
+                    "participants": [{"userId": str(uid), "count": c} for uid, c in participants.items()],
+                    "htmlDigest": html_digest,
+                    "createdAt": dt.datetime.utcnow(),
+                })
             except Exception as e:
                 print(f"❌ Error saving transcript to DB: {e}")
 
@@ -104,17 +164,17 @@ class Transcripts(commands.Cog):
             view = discord.ui.View()
             view.add_item(discord.ui.Button(label="View HTML Transcript", style=discord.ButtonStyle.link, url=html_link))
 
-            # Prepare the TXT file to attach
-            txt_file = discord.File(txt_path, filename=txt_name)
-
-            # Send to the user (ephemeral)
-            try:
-                if not getattr(interaction.response, "is_done", lambda: False)():
-                    await interaction.response.send_message(embed=embed, view=view, files=[txt_file], ephemeral=True)
-                else:
-                    await interaction.followup.send(embed=embed, view=view, files=[txt_file], ephemeral=True)
-            except Exception as e:
-                print(f"❌ Error sending transcript to user: {e}")
+            # Send to the user (ephemeral); background jobs have nobody to reply to
+            if interaction is not None:
+                # Only opened here: an unsent discord.File keeps its handle open
+                txt_file = discord.File(txt_path, filename=txt_name)
+                try:
+                    if not getattr(interaction.response, "is_done", lambda: False)():
+                        await interaction.response.send_message(embed=embed, view=view, files=[txt_file], ephemeral=True)
+                    else:
+                        await interaction.followup.send(embed=embed, view=view, files=[txt_file], ephemeral=True)
+                except Exception as e:
+                    print(f"❌ Error sending transcript to user: {e}")
 
             # Send to the transcript log channel (try cache then fetch)
             try:
@@ -138,12 +198,20 @@ class Transcripts(commands.Cog):
                     # Re-create the file object (discord.File objects cannot be re-used after sending)
                     txt_file_for_log = discord.File(txt_path, filename=txt_name)
                     await log_channel.send(embed=embed, view=view, files=[txt_file_for_log])
+                elif TRANSCRIPT_CHANNEL_ID:
+                    raise RuntimeError("Transcript log channel not found or unavailable.")
                 else:
-                    print("❌ Transcript log channel not found or unavailable; skipping log send.")
+                    print("❌ TRANSCRIPT_CHANNEL_ID is not set; skipping log send.")
             except Exception as e:
                 print(f"❌ Could not send transcript to log channel: {e}")
+                if interaction is None:
+                    # Background close: the log channel is the only copy, so let the job retry
+                    raise
 
         except Exception as e:
+            print(f"❌ Generate transcript failed: {e}")
+            if interaction is None:
+                raise
             # Fallback error reporting to interaction
             try:
                 if not getattr(interaction.response, "is_done", lambda: False)():
@@ -152,7 +220,8 @@ class Transcripts(commands.Cog):
                     await interaction.followup.send(f"❌ Error generating transcript: {e}", ephemeral=True)
             except Exception:
                 pass
-            print(f"❌ Generate transcript failed: {e}")
+        finally:
+            await run_io(_discard, txt_path)
 
     # ---------------------------
     # Button interaction
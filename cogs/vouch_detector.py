@@ -1,11 +1,15 @@
+from typing import Optional
 import discord
 from discord.ext import commands
 from discord.ui import View, Button
 from utils.db import collections
+from utils import ticket_registry, vouch_routes, vouch_state, dispatch
+from utils.vouch_matcher import get_matcher
 from utils.constants import TICKET_CATEGORY_ID, MIDDLEMAN_ROLE_ID, LB_CHANNEL_ID, LB_MESSAGE_ID
-from datetime import datetime
 
 # ------------------------- MM Server/Channel Config -------------------------
+# Seed only: routes live in the vouchChannels collection (see $setvouchchannel).
+# Optional per-MM "keywords" list replaces VOUCH_KEYWORDS for that middleman.
 MM_VOUCH_CONFIG = {
     1356149794040446998: {  # Replace with actual MM Discord ID
         "server_id": 1373025601212125315,
@@ -50,83 +54,27 @@ class VouchConfirmView(View):
             if not ticket_channel:
                 return await interaction.followup.send("❌ Could not find ticket channel.", ephemeral=True)
 
-            # ----------------- Generate Transcript -----------------
-            transcript_cog = interaction.client.get_cog("Transcripts")
-            if transcript_cog:
-                try:
-                    await transcript_cog.generate_transcript(interaction, ticket_channel)
-                    print(f"[VOUCH] ✅ Transcript generated")
-                except Exception as e:
-                    print(f"[VOUCH] Transcript error: {e}")
-
-            # ----------------- Log Points & Update Leaderboard & Quota -----------------
             colls = await collections()
-            tickets_coll = colls["tickets"]
-            points_coll = colls["clientPoints"]
-            mm_coll = colls["middlemen"]
-            quota_coll = colls["weeklyQuota"]
-
-            ticket_data = await tickets_coll.find_one({"channelId": str(self.ticket_channel_id)})
+            ticket_data = await colls["tickets"].find_one({"channelId": str(self.ticket_channel_id)})
             if not ticket_data:
                 return await interaction.followup.send("❌ Ticket data not found.", ephemeral=True)
 
-                        # Only log points for users in the ticket
-            user_ids = [str(uid) for uid in self.expected_users if uid]
-            for uid in user_ids:
-                await points_coll.update_one(
-                    {"userId": uid},
-                    {"$inc": {"points": 1}, "$setOnInsert": {"userId": uid}},
-                    upsert=True
-                )
-            
-            # ------------------- Update Client Leaderboard -------------------
-            ticket_points_cog = self.bot.get_cog("TicketPoints")
-            if ticket_points_cog:
-                try:
-                    await ticket_points_cog.log_points(ticket_channel)
-                except Exception as e:
-                    print(f"[VOUCH] ❌ Client leaderboard update error: {e}")
-            
-            # ------------------- Update Middleman Leaderboard -------------------
-            mm_id_for_db = int(ticket_data.get("claimedBy"))
-            current_week = datetime.utcnow().isocalendar()[1]
-
-            await mm_coll.update_one(
-                {"_id": mm_id_for_db},
-                {"$inc": {"completed": 1}, "$set": {"week": current_week}},
-                upsert=True
+            # ----------------- Transcript, Points, Quota, Boards, Delete -----------------
+            # Runs in the background close queue; survives restarts and retries on failure
+            close_jobs = self.bot.get_cog("CloseJobs")
+            if not close_jobs:
+                return await interaction.followup.send("❌ Close queue not loaded.", ephemeral=True)
+
+            await close_jobs.enqueue(
+                "vouch", ticket_channel,
+                claimed_by=ticket_data.get("claimedBy"),
+                users=self.expected_users,
+                requested_by=interaction.user.id
+            )
+            await interaction.followup.send(
+                "✅ Vouch confirmed! Transcript, points, leaderboard & quota are being processed — the ticket will close shortly.",
+                ephemeral=True
             )
-
-            # ------------------- Update Weekly Quota -------------------
-            quota_doc = await quota_coll.find_one({"_id": mm_id_for_db})
-            if quota_doc and quota_doc.get("week") == current_week:
-                await quota_coll.update_one(
-                    {"_id": mm_id_for_db},
-                    {"$inc": {"completed": 1}}
-                )
-            else:
-                await quota_coll.update_one(
-                    {"_id": mm_id_for_db},
-                    {"$set": {"completed": 1, "week": current_week}},
-                    upsert=True
-                )
-
-            # ------------------- Refresh Boards -------------------
-            quota_cog = self.bot.get_cog("Quota")
-            if quota_cog:
-                await quota_cog.send_quota_on_startup()  # safe: only sends if none exists
-
-            mm_lb_cog = self.bot.get_cog("MiddlemanLeaderboard")
-            if mm_lb_cog:
-                for guild in self.bot.guilds:
-                    await mm_lb_cog.update_or_create_lb(guild)
-
-            # ----------------- Remove ticket from DB -----------------
-            await tickets_coll.delete_one({"channelId": str(self.ticket_channel_id)})
-
-            # ----------------- Delete the ticket channel -----------------
-            await ticket_channel.delete(reason="Vouch confirmed by MM/Admin")
-            await interaction.followup.send("✅ Points logged, leaderboard & quota updated, and ticket closed!", ephemeral=True)
 
         except Exception as e:
             print(f"[VOUCH] Confirmation error: {e}")
@@ -148,34 +96,46 @@ class VouchConfirmView(View):
 class VouchDetector(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self._vouched_users_cache = {}  # ticket_channel_id -> set of user IDs who have vouched
+        self._routes_loaded = False
+        # Every channel until the routes are loaded, then only vouch channels
+        dispatch.subscribe("vouch_detector", self.handle_message, everywhere=True)
 
-    def _contains_vouch(self, content: str) -> bool:
-        return any(keyword in content.lower() for keyword in VOUCH_KEYWORDS)
+    def cog_unload(self):
+        dispatch.unsubscribe("vouch_detector")
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
+    async def _load_routes(self):
+        if self._routes_loaded:
             return
+        await vouch_routes.ensure_loaded(MM_VOUCH_CONFIG)
+        self._routes_loaded = True
+        self._subscribe()
+
+    def _subscribe(self):
+        dispatch.subscribe("vouch_detector", self.handle_message, channels=vouch_routes.channel_ids())
 
-        mm_id = None
-        for mid, config in MM_VOUCH_CONFIG.items():
-            if message.guild and message.guild.id == config["server_id"] and message.channel.id == config["channel_id"]:
-                mm_id = mid
-                break
+    def _contains_vouch(self, content: str, keywords=None) -> bool:
+        # Compiled once per keyword list; cost per message doesn't grow with the list
+        return get_matcher(keywords or VOUCH_KEYWORDS).matches(content)
 
-        if not mm_id or not self._contains_vouch(message.content):
+    async def handle_message(self, message: discord.Message):
+        """Routed by utils/dispatch.py (non-bot messages in vouch channels)."""
+        if not message.guild:
             return
 
-        try:
-            colls = await collections()
-            tickets_coll = colls["tickets"]
+        await self._load_routes()
+        vouch_route = vouch_routes.route(message.guild.id, message.channel.id)
+        if not vouch_route or not self._contains_vouch(message.content, vouch_route["keywords"]):
+            return
+        mm_id = vouch_route["mm_id"]
 
-            ticket_data = await tickets_coll.find_one({"claimedBy": str(mm_id)})
-            if not ticket_data:
+        try:
+            # Active tickets are tracked in memory (updated on claim / close) — no DB round trip
+            await ticket_registry.ensure_loaded()
+            claimed = ticket_registry.claimed_ticket(mm_id)
+            if not claimed:
                 return
 
-            ticket_channel_id = int(ticket_data["channelId"])
+            ticket_channel_id, ticket_data = claimed
             expected_users = [str(ticket_data.get("user1"))]
             if ticket_data.get("user2"):
                 expected_users.append(str(ticket_data.get("user2")))
@@ -184,17 +144,16 @@ class VouchDetector(commands.Cog):
             if str(message.author.id) not in expected_users:
                 return
 
-            # Track vouched users per ticket
-            vouched_set = self._vouched_users_cache.get(ticket_channel_id, set())
-            vouched_set.add(str(message.author.id))
-            self._vouched_users_cache[ticket_channel_id] = vouched_set
+            # Track vouched users per ticket (bounded, persisted across restarts)
+            vouched_set = await vouch_state.add_vouch(ticket_channel_id, message.author.id)
 
-            ticket_channel = message.guild.get_channel(ticket_channel_id) or await message.guild.fetch_channel(ticket_channel_id)
+            # The vouch channel may live in the MM's own server, so resolve through the bot
+            ticket_channel = self.bot.get_channel(ticket_channel_id) or await self.bot.fetch_channel(ticket_channel_id)
             await ticket_channel.send(f"**{message.author.mention} has vouched!**")
 
             # Only send confirmation when all expected users have vouched
             if all(uid in vouched_set for uid in expected_users):
-                mm_member = message.guild.get_member(mm_id)
+                mm_member = ticket_channel.guild.get_member(mm_id)
                 vouch_text = " | ".join(f"<@{uid}>" for uid in expected_users)
                 embed = discord.Embed(
                     title="**•__ALL USERS HAVE VOUCHED | HOW WOULD YOU LIKE TO PROCEED?•__**",
@@ -212,13 +171,39 @@ class VouchDetector(commands.Cog):
                 embed.set_footer(text="Middleman Confirmation | Proceed Carefully")
 
                 view = VouchConfirmView(ticket_channel.id, mm_id, expected_users, message.jump_url, self.bot)
-                await ticket_channel.send(content=mm_member.mention, embed=embed, view=view)
+                await ticket_channel.send(content=mm_member.mention if mm_member else f"<@{mm_id}>", embed=embed, view=view)
 
         except Exception as e:
             print(f"[VOUCH DEBUG] ❌ Vouch detection error: {e}")
             import traceback
             traceback.print_exc()
 
+    # ------------------------- Vouch channel config -------------------------
+    @commands.command(name="setvouchchannel", aliases=["vouchchannel"])
+    @commands.has_permissions(manage_guild=True)
+    @commands.guild_only()
+    async def set_vouch_channel(self, ctx: commands.Context, channel: discord.TextChannel, member: Optional[discord.Member] = None, *, keywords: str = None):
+        """Routes vouches in `channel` to a middleman (default: you). Optional comma-separated keywords."""
+        mm = member or ctx.author
+        kw_list = [k.strip() for k in keywords.split(",") if k.strip()] if keywords else None
+        await self._load_routes()
+        await vouch_routes.set_route(mm.id, ctx.guild.id, channel.id, kw_list)
+        self._subscribe()
+        extra = f" with keywords: {', '.join(kw_list)}" if kw_list else ""
+        await ctx.reply(f"✅ Vouches in {channel.mention} now count for {mm.mention}{extra}.", mention_author=False)
+
+    @commands.command(name="removevouchchannel")
+    @commands.has_permissions(manage_guild=True)
+    @commands.guild_only()
+    async def remove_vouch_channel(self, ctx: commands.Context, member: discord.Member = None):
+        mm = member or ctx.author
+        await self._load_routes()
+        if await vouch_routes.remove_route(mm.id):
+            self._subscribe()
+            await ctx.reply(f"🗑️ Removed the vouch channel for {mm.mention}.", mention_author=False)
+        else:
+            await ctx.reply(f"❌ {mm.mention} has no vouch channel set.", mention_author=False)
+
 
 # -------------------------
 # Cog setup
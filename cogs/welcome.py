@@ -1,5 +1,6 @@
 import discord
 from discord.ext import commands
+from utils import avatar_cache
 
 WELCOME_CHANNEL_ID = 1373078546422960148  # Replace with your welcome channel ID
 VOUCHES_CHANNEL_ID = 1373027974827212923
@@ -27,7 +28,7 @@ class WelcomeMessage(commands.Cog):
             ),
             timestamp=discord.utils.utcnow()
         )
-        embed.set_thumbnail(url=member.display_avatar.url)
+        embed.set_thumbnail(url=avatar_cache.avatar_url(member, 256))
         embed.set_footer(text=f"User ID: {member.id}")
 
         await welcome_channel.send(embed=embed)
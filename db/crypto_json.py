@@ -1,34 +1,31 @@
-import json
-import os
+from utils.json_store import JsonStore
 
 DB_PATH = "crypto.json"
 
+# Loaded once; reads come from memory and writes are flushed in batches
+_store = JsonStore(DB_PATH)
+
 # --- Load JSON ---
 def load_data():
-    if not os.path.exists(DB_PATH):
-        return {}
-    with open(DB_PATH, "r") as f:
-        return json.load(f)
+    return _store.data
 
 # --- Save JSON ---
 def save_data(data):
-    with open(DB_PATH, "w") as f:
-        json.dump(data, f, indent=4)
+    store = _store.data
+    if data is not store:
+        store.clear()
+        store.update(data)
+    _store.mark_dirty()
 
 # --- Save a crypto address ---
 def save_crypto_address(user_id: str, crypto_type: str, address: str):
-    data = load_data()
-    if user_id not in data:
-        data[user_id] = {}
-    data[user_id][crypto_type] = address
-    save_data(data)
+    _store.data.setdefault(user_id, {})[crypto_type] = address
+    _store.mark_dirty()
 
 # --- Get one address ---
 def get_crypto_address(user_id: str, crypto_type: str):
-    data = load_data()
-    return data.get(user_id, {}).get(crypto_type)
+    return _store.data.get(user_id, {}).get(crypto_type)
 
 # --- Get all addresses for a user ---
 def get_all_crypto_addresses(user_id: str):
-    data = load_data()
-    return data.get(user_id, {})
\ No newline at end of file
+    return dict(_store.data.get(user_id, {}))
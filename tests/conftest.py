@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Cogs and utils are imported as top-level packages, as bot.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
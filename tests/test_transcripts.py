@@ -0,0 +1,68 @@
+import sys
+import types
+import asyncio
+import importlib.util
+
+import discord
+
+# chat_exporter is an optional runtime dependency; stand in for it when absent
+if importlib.util.find_spec("chat_exporter") is None:
+    sys.modules["chat_exporter"] = types.SimpleNamespace(init_exporter=lambda bot: None, raw_export=None)
+
+from cogs import transcripts  # noqa: E402
+
+
+class MotorLikeCollection:
+    """Raises on truth-testing like a Motor collection."""
+    def __init__(self):
+        self.inserted = []
+
+    def __bool__(self):
+        raise NotImplementedError("Collection objects do not implement truth value testing")
+
+    async def insert_one(self, doc):
+        self.inserted.append(doc)
+
+
+class FakeChannel(discord.TextChannel):
+    def __init__(self):
+        self.id = 1234
+        self.name = "ticket-1234"
+        self.guild = types.SimpleNamespace(id=1)
+
+
+class FakeStream:
+    def __init__(self, channel, txt_path):
+        self.participants = {42: 3}
+        self.messages = []
+
+    async def run(self):
+        return self
+
+
+def test_transcript_record_includes_html_digest(monkeypatch, tmp_path):
+    coll = MotorLikeCollection()
+
+    async def fake_collections():
+        return {"transcripts": coll}
+
+    async def fake_export(channel, **kwargs):
+        return "<html></html>"
+
+    monkeypatch.setattr(transcripts, "collections", fake_collections)
+    monkeypatch.setattr(transcripts, "TranscriptStream", FakeStream)
+    monkeypatch.setattr(transcripts, "TRANSCRIPT_CHANNEL_ID", None)
+    monkeypatch.setattr(transcripts.chat_exporter, "raw_export", fake_export, raising=False)
+    monkeypatch.setattr(transcripts.transcript_store, "spool_path", lambda name: str(tmp_path / name))
+    monkeypatch.setattr(transcripts.transcript_store, "put_html", lambda *args: "abc123")
+    monkeypatch.setattr(transcripts.transcript_store, "put_file", lambda *args: None)
+
+    cog = transcripts.Transcripts.__new__(transcripts.Transcripts)
+    cog.bot = None
+    asyncio.run(cog._generate_transcript(None, FakeChannel()))
+
+    assert len(coll.inserted) == 1
+    record = coll.inserted[0]
+    assert record["htmlDigest"] == "abc123"
+    assert record["channelId"] == "1234"
+    assert record["participants"] == [{"userId": "42", "count": 3}]
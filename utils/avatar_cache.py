@@ -0,0 +1,254 @@
+import os
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+import aiohttp
+import discord
+from utils.json_store import JsonStore
+
+CACHE_DIR = os.getenv("AVATAR_CACHE_DIR", "./cache/avatars")
+MAX_BYTES = int(os.getenv("AVATAR_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# After this long a cached avatar is re-checked with If-None-Match / If-Modified-Since
+REVALIDATE_AFTER = int(os.getenv("AVATAR_CACHE_REVALIDATE_SECONDS", str(24 * 3600)))
+# Sizes the Discord CDN serves; requests are rounded up so variants are shared
+SIZE_BUCKETS = (16, 32, 64, 128, 256, 512, 1024)
+
+OBJECTS_DIR = os.path.join(CACHE_DIR, "objects")
+
+# url -> {"digest", "bytes", "etag", "lastModified", "checked"}; persisted so a
+# restart keeps the cache. Order of _lru is least → most recently used.
+_index = JsonStore(os.path.join(CACHE_DIR, "index.json"), flush_delay=10.0, indent=None)
+_lru: "OrderedDict[str, dict] | None" = None
+_refs: dict[str, int] = {}       # digest -> index entries pointing at it
+_sizes: dict[str, int] = {}      # digest -> bytes on disk
+_total = 0
+_inflight: dict[str, asyncio.Future] = {}
+_session: aiohttp.ClientSession | None = None
+
+
+def bucket(size: int) -> int:
+    """Smallest CDN size >= size (capped at the largest bucket)."""
+    for b in SIZE_BUCKETS:
+        if b >= size:
+            return b
+    return SIZE_BUCKETS[-1]
+
+
+def avatar_url(user: discord.abc.User, size: int = 1024) -> str:
+    """Static PNG avatar URL at a bucketed size, so every caller shares the same variants."""
+    return user.display_avatar.replace(size=bucket(size), format="png").url
+
+
+def _object_path(digest: str) -> str:
+    return os.path.join(OBJECTS_DIR, digest[:2], f"{digest}.png")
+
+
+# ------------------------- Index / LRU -------------------------
+def _entries() -> "OrderedDict[str, dict]":
+    global _lru
+    if _lru is None:
+        stored = _index.data.setdefault("entries", {})
+        _lru = OrderedDict()
+        for url, entry in sorted(stored.items(), key=lambda kv: kv[1].get("used", 0)):
+            if os.path.exists(_object_path(entry["digest"])):
+                _lru[url] = entry
+                _ref(entry["digest"], entry["bytes"])
+            else:
+                del stored[url]
+    return _lru
+
+
+def _ref(digest: str, size: int):
+    global _total
+    if digest not in _refs:
+        _sizes[digest] = size
+        _total += size
+    _refs[digest] = _refs.get(digest, 0) + 1
+
+
+def _unref(digest: str):
+    global _total
+    _refs[digest] -= 1
+    if _refs[digest] <= 0:
+        del _refs[digest]
+        _total -= _sizes.pop(digest, 0)
+        try:
+            os.remove(_object_path(digest))
+        except OSError:
+            pass
+
+
+def _touch(url: str, entry: dict):
+    entries = _entries()
+    if entries.get(url) is not entry:
+        return  # evicted or replaced while we were awaiting
+    entry["used"] = time.time()
+    entries.move_to_end(url)
+    _index.mark_dirty()
+
+
+def _forget(url: str):
+    entry = _entries().pop(url, None)
+    _index.data["entries"].pop(url, None)
+    if entry:
+        _unref(entry["digest"])
+
+
+def _evict():
+    """Drops least recently used entries until the cache fits in MAX_BYTES."""
+    entries = _entries()
+    while _total > MAX_BYTES and entries:
+        url = next(iter(entries))
+        _forget(url)
+    _index.mark_dirty()
+
+
+def _write_object(data: bytes) -> str:
+    """Writes the image under its sha256 (runs in a thread); returns the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return digest
+
+
+def _record(url: str, digest: str, size: int, etag: str | None, last_modified: str | None):
+    old = _entries().get(url)
+    if old is None or old["digest"] != digest:
+        _ref(digest, size)
+        if old is not None:
+            _unref(old["digest"])
+    entry = {"digest": digest, "bytes": size, "etag": etag, "lastModified": last_modified,
+             "checked": time.time()}
+    _entries()[url] = entry
+    _index.data["entries"][url] = entry
+    _touch(url, entry)
+    _evict()
+
+
+def _read(digest: str) -> bytes | None:
+    try:
+        with open(_object_path(digest), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+# ------------------------- HTTP -------------------------
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return _session
+
+
+async def close():
+    global _session
+    _index.flush()
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def _fetch(url: str) -> tuple[str, bytes] | None:
+    entry = _entries().get(url)
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("lastModified"):
+            headers["If-Modified-Since"] = entry["lastModified"]
+    try:
+        async with _get_session().get(url, headers=headers) as resp:
+            if resp.status == 304 and entry:
+                entry["checked"] = time.time()
+                _touch(url, entry)
+                data = await asyncio.to_thread(_read, entry["digest"])
+                return (entry["digest"], data) if data else None
+            if resp.status != 200:
+                print(f"[AvatarCache] {url} → HTTP {resp.status}")
+                return _stale(url)
+            data = await resp.read()
+            digest = await asyncio.to_thread(_write_object, data)
+            _record(url, digest, len(data), resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+            return digest, data
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[AvatarCache] Fetch failed for {url}: {e}")
+        return _stale(url)
+
+
+def _stale(url: str) -> tuple[str, bytes] | None:
+    """Serves the old copy when the CDN can't be reached."""
+    entry = _entries().get(url)
+    if not entry:
+        return None
+    data = _read(entry["digest"])
+    return (entry["digest"], data) if data else None
+
+
+# ------------------------- API -------------------------
+async def get(url: str) -> tuple[str, bytes] | None:
+    """
+    (sha256 digest, image bytes) for an avatar URL. Served from disk while
+    fresh; re-validated after REVALIDATE_AFTER; concurrent calls for the same
+    URL share one download.
+    """
+    entry = _entries().get(url)
+    if entry and time.time() - entry.get("checked", 0) < REVALIDATE_AFTER:
+        data = await asyncio.to_thread(_read, entry["digest"])
+        if data:
+            _touch(url, entry)
+            return entry["digest"], data
+        _forget(url)
+
+    pending = _inflight.get(url)
+    if pending:
+        return await asyncio.shield(pending)
+    future = asyncio.get_running_loop().create_future()
+    _inflight[url] = future
+    try:
+        result = await _fetch(url)
+        future.set_result(result)
+        return result
+    except Exception as e:
+        print(f"[AvatarCache] ❌ {url}: {e}")
+        return None
+    finally:
+        if not future.done():
+            future.set_result(None)
+        _inflight.pop(url, None)
+
+
+async def get_avatar(user: discord.abc.User, size: int = 64) -> tuple[str, bytes] | None:
+    return await get(avatar_url(user, size))
+
+
+async def for_members(guild: discord.Guild | None, user_ids, size: int = 64) -> tuple[dict, dict]:
+    """
+    Avatars for image cards: ({user_id: digest}, {digest: bytes}).
+    Users not in the guild cache are skipped (the card draws initials).
+    """
+    users = {}
+    for uid in user_ids:
+        try:
+            member = guild.get_member(int(uid)) if guild else None
+        except (TypeError, ValueError):
+            member = None
+        if member:
+            users[uid] = member
+    results = await asyncio.gather(*(get_avatar(m, size) for m in users.values()))
+    digests, blobs = {}, {}
+    for uid, result in zip(users, results):
+        if result:
+            digest, data = result
+            digests[uid] = digest
+            blobs[digest] = data
+    return digests, blobs
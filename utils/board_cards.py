@@ -0,0 +1,203 @@
+import io
+import os
+import asyncio
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+
+# Rendering runs in worker processes so a board refresh never blocks the event loop
+BOARD_CARD_WORKERS = int(os.getenv("BOARD_CARD_WORKERS", "1"))
+FONT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ARIAL.TTF")
+
+# ---- Layout ----
+WIDTH = 900
+PAD = 28
+HEADER_H = 118
+ROW_H = 64
+AVATAR = 44
+FOOTER_H = 46
+
+BG = (43, 45, 49)
+ROW_BG = (49, 51, 56)
+TEXT = (242, 243, 245)
+MUTED = (148, 155, 164)
+BAR_BG = (30, 31, 34)
+BAR_DONE = (35, 165, 90)
+BAR_TODO = (88, 101, 242)
+RANK_COLORS = {1: (240, 178, 50), 2: (192, 198, 206), 3: (205, 127, 50)}
+
+
+# ------------------------- Worker side -------------------------
+@lru_cache(maxsize=16)
+def _font(size: int):
+    """One FreeType face per size per process; Pillow caches rendered glyphs on it."""
+    try:
+        return ImageFont.truetype(FONT_PATH, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def _text_width(text: str, size: int) -> int:
+    return int(_font(size).getlength(text))
+
+
+def _fit(text: str, size: int, max_width: int) -> str:
+    if _text_width(text, size) <= max_width:
+        return text
+    while text and _text_width(text + "…", size) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+@lru_cache(maxsize=4)
+def _avatar_mask(size: int) -> Image.Image:
+    # Drawn at 4x and downsampled for a smooth edge
+    big = Image.new("L", (size * 4, size * 4), 0)
+    ImageDraw.Draw(big).ellipse((0, 0, size * 4 - 1, size * 4 - 1), fill=255)
+    return big.resize((size, size), Image.LANCZOS)
+
+
+# (digest, size) -> circular RGBA tile, reused across renders in this process
+_tiles: "OrderedDict[tuple[str, int], Image.Image]" = OrderedDict()
+_TILE_CACHE_MAX = 512
+
+
+def _avatar_tile(digest: str, data: bytes | None, size: int) -> Image.Image | None:
+    key = (digest, size)
+    tile = _tiles.get(key)
+    if tile is not None:
+        _tiles.move_to_end(key)
+        return tile
+    if not data:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as src:
+            tile = src.convert("RGBA").resize((size, size), Image.LANCZOS)
+    except Exception:
+        return None
+    tile.putalpha(_avatar_mask(size))
+    _tiles[key] = tile
+    while len(_tiles) > _TILE_CACHE_MAX:
+        _tiles.popitem(last=False)
+    return tile
+
+
+@lru_cache(maxsize=256)
+def _initials_tile(name: str, size: int) -> Image.Image:
+    tile = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(tile)
+    shade = int(hashlib.md5(name.encode()).hexdigest()[:6], 16)
+    color = (80 + (shade >> 16) % 120, 80 + (shade >> 8 & 0xFF) % 120, 80 + (shade & 0xFF) % 120)
+    draw.ellipse((0, 0, size - 1, size - 1), fill=color)
+    letter = (name.strip()[:1] or "?").upper()
+    draw.text((size / 2, size / 2), letter, font=_font(size // 2), fill=TEXT, anchor="mm")
+    return tile
+
+
+def render_card(spec: dict, avatars: dict | None = None) -> bytes:
+    """
+    Draws a board to PNG bytes. `spec` is plain data so it can cross the
+    process boundary:
+        {"title", "subtitle", "footer", "rows": [
+            {"rank", "name", "value", "progress" (0..1 or None), "done" (bool), "avatar" (digest or None)}]}
+    `avatars` maps digest -> image bytes; tiles are cached per process by digest.
+    """
+    avatars = avatars or {}
+    rows = spec.get("rows") or []
+    height = HEADER_H + max(len(rows), 1) * ROW_H + FOOTER_H + PAD
+    img = Image.new("RGBA", (WIDTH, height), BG)
+    draw = ImageDraw.Draw(img)
+
+    # ---- Header ----
+    draw.text((PAD, PAD), spec.get("title", ""), font=_font(38), fill=TEXT)
+    if spec.get("subtitle"):
+        draw.text((PAD, PAD + 50), spec["subtitle"], font=_font(20), fill=MUTED)
+
+    # ---- Rows ----
+    y = HEADER_H
+    if not rows:
+        draw.text((PAD, y + ROW_H / 2), spec.get("empty", "No data yet."), font=_font(24), fill=MUTED, anchor="lm")
+    for row in rows:
+        draw.rounded_rectangle((PAD - 8, y + 4, WIDTH - PAD + 8, y + ROW_H - 4), radius=10, fill=ROW_BG)
+        mid = y + ROW_H // 2
+        rank = row["rank"]
+        draw.text((PAD + 30, mid), f"#{rank}", font=_font(24), fill=RANK_COLORS.get(rank, MUTED), anchor="mm")
+
+        x = PAD + 66
+        digest = row.get("avatar")
+        tile = _avatar_tile(digest, avatars.get(digest), AVATAR) if digest else None
+        tile = tile or _initials_tile(row["name"], AVATAR)
+        img.alpha_composite(tile, (x, mid - AVATAR // 2))
+        x += AVATAR + 16
+
+        value = row.get("value", "")
+        value_w = _text_width(value, 24)
+        draw.text((WIDTH - PAD, mid), value, font=_font(24), fill=TEXT, anchor="rm")
+
+        name_w = WIDTH - PAD - value_w - 24 - x
+        progress = row.get("progress")
+        if progress is None:
+            draw.text((x, mid), _fit(row["name"], 24, name_w), font=_font(24), fill=TEXT, anchor="lm")
+        else:
+            draw.text((x, mid - 9), _fit(row["name"], 22, name_w), font=_font(22), fill=TEXT, anchor="lm")
+            bar_w = min(name_w, 300)
+            draw.rounded_rectangle((x, mid + 10, x + bar_w, mid + 18), radius=4, fill=BAR_BG)
+            filled = int(bar_w * max(0.0, min(progress, 1.0)))
+            if filled:
+                draw.rounded_rectangle((x, mid + 10, x + filled, mid + 18), radius=4,
+                                       fill=BAR_DONE if row.get("done") else BAR_TODO)
+        y += ROW_H
+
+    # ---- Footer ----
+    if spec.get("footer"):
+        draw.text((PAD, height - PAD - FOOTER_H / 2), spec["footer"], font=_font(18), fill=MUTED, anchor="lm")
+
+    out = io.BytesIO()
+    # Level 1: encoding dominates render time and the size gain above it is small
+    img.convert("RGB").save(out, format="PNG", compress_level=1)
+    return out.getvalue()
+
+
+# ------------------------- Event loop side -------------------------
+_pool: ProcessPoolExecutor | None = None
+# spec hash -> PNG; a board whose data didn't change is never redrawn
+_rendered: "OrderedDict[str, bytes]" = OrderedDict()
+_RENDER_CACHE_MAX = 32
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: workers don't inherit the bot's sockets, threads or event loop
+        _pool = ProcessPoolExecutor(max_workers=BOARD_CARD_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def spec_key(spec: dict) -> str:
+    return hashlib.sha1(repr(spec).encode()).hexdigest()
+
+
+async def render(spec: dict, avatars: dict | None = None) -> bytes:
+    """PNG for `spec`, rendered in the process pool, or straight from cache if drawn before."""
+    key = spec_key(spec)
+    png = _rendered.get(key)
+    if png is not None:
+        _rendered.move_to_end(key)
+        return png
+    loop = asyncio.get_running_loop()
+    png = await loop.run_in_executor(_get_pool(), render_card, spec, avatars)
+    _rendered[key] = png
+    while len(_rendered) > _RENDER_CACHE_MAX:
+        _rendered.popitem(last=False)
+    return png
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,164 @@
+import io
+import os
+import asyncio
+import discord
+from utils.db import collections
+from utils import board_cards
+
+# Many ticket closes inside this window collapse into one render per board
+REFRESH_INTERVAL = float(os.getenv("BOARD_REFRESH_INTERVAL", "5"))
+
+# Board names used across cogs
+MIDDLEMEN = "middlemen"
+QUOTA = "quota"
+CLIENTS = "clients"
+PANEL = "panel"
+
+# How far back to look for a board message the registry doesn't know yet
+HISTORY_SCAN_LIMIT = 50
+
+_renderers: dict[str, callable] = {}   # board name -> async render()
+_dirty: set[str] = set()
+_tasks: dict[str, asyncio.Task] = {}
+
+
+def register(name: str, render):
+    """Registers the coroutine function that rebuilds and edits a board."""
+    _renderers[name] = render
+
+
+def unregister(name: str):
+    _renderers.pop(name, None)
+    _dirty.discard(name)
+    task = _tasks.pop(name, None)
+    if task:
+        task.cancel()
+
+
+def mark_dirty(*names: str):
+    """
+    Flags boards as out of date and returns immediately. Each board is
+    rendered once REFRESH_INTERVAL seconds later, however often it was marked.
+    """
+    for name in names:
+        if name not in _renderers:
+            continue
+        _dirty.add(name)
+        if name not in _tasks:
+            _tasks[name] = asyncio.create_task(_refresh(name))
+
+
+async def _refresh(name: str):
+    try:
+        while name in _dirty:
+            await asyncio.sleep(REFRESH_INTERVAL)
+            _dirty.discard(name)
+            render = _renderers.get(name)
+            if render is None:
+                return
+            try:
+                await render()
+            except Exception as e:
+                print(f"[Boards] ❌ Refresh of '{name}' failed: {e}")
+    finally:
+        if _tasks.get(name) is asyncio.current_task():
+            del _tasks[name]
+
+
+# ------------------------- Message registry -------------------------
+# "<guild_id>:<board>" -> (channel_id, message_id); mirrors the boards collection
+_messages: dict[str, tuple[int, int]] = {}
+
+
+def _key(guild_id: int, board: str) -> str:
+    return f"{guild_id}:{board}"
+
+
+async def _lookup(key: str) -> tuple[int, int] | None:
+    if key in _messages:
+        return _messages[key]
+    colls = await collections()
+    doc = await colls["boards"].find_one({"_id": key})
+    if doc:
+        _messages[key] = (int(doc["channelId"]), int(doc["messageId"]))
+    return _messages.get(key)
+
+
+async def _remember(key: str, board: str, message: discord.Message):
+    _messages[key] = (message.channel.id, message.id)
+    colls = await collections()
+    await colls["boards"].update_one(
+        {"_id": key},
+        {"$set": {
+            "guildId": str(message.guild.id),
+            "board": board,
+            "channelId": str(message.channel.id),
+            "messageId": str(message.id),
+        }},
+        upsert=True
+    )
+
+
+async def publish(channel: discord.TextChannel, board: str, matcher, files=None, **kwargs) -> tuple[discord.Message, bool]:
+    """
+    Edits this guild's `board` message in `channel` with kwargs, or sends it.
+    The message ID comes from the boards registry, so a refresh is a single
+    edit call. Only on a registry miss (or a deleted message) is recent
+    history scanned with `matcher(msg) -> bool`. Returns (message, created).
+    `files` replace the message's attachments (an empty list removes them).
+    """
+    def edit_kwargs():
+        if files is None:
+            return kwargs
+        for f in files:
+            f.reset()
+        return {**kwargs, "attachments": files}
+
+    key = _key(channel.guild.id, board)
+    known = await _lookup(key)
+    if known and known[0] == channel.id:
+        try:
+            return await channel.get_partial_message(known[1]).edit(**edit_kwargs()), False
+        except discord.NotFound:
+            _messages.pop(key, None)
+
+    existing = None
+    async for msg in channel.history(limit=HISTORY_SCAN_LIMIT):
+        if matcher(msg):
+            existing = msg
+            break
+
+    if existing:
+        message, created = await existing.edit(**edit_kwargs()), False
+    else:
+        for f in files or ():
+            f.reset()
+        message, created = await channel.send(files=files or None, **kwargs), True
+    await _remember(key, board, message)
+    return message, created
+
+
+# ------------------------- Image cards -------------------------
+def member_name(guild: discord.Guild | None, user_id) -> str:
+    """Display name for a card row (cards can't render mentions)."""
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return str(user_id)
+    member = guild.get_member(user_id) if guild else None
+    return member.display_name if member else f"User {user_id}"
+
+
+async def attach_card(embed: discord.Embed, spec: dict, filename: str, avatars: dict | None = None) -> list[discord.File] | None:
+    """
+    Renders `spec` to a PNG (off the event loop; cached while the data is
+    unchanged) and points the embed's image at it. Returns the files to
+    publish, or None if rendering failed and the caller should keep text.
+    """
+    try:
+        png = await board_cards.render(spec, avatars)
+    except Exception as e:
+        print(f"[Boards] ❌ Card render for {filename} failed: {e}")
+        return None
+    embed.set_image(url=f"attachment://{filename}")
+    return [discord.File(io.BytesIO(png), filename=filename)]
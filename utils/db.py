@@ -3,6 +3,50 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 _mongo: AsyncIOMotorClient | None = None
 _db = None
+_collections: dict | None = None
+
+# Collection handles returned by collections()
+COLLECTION_NAMES = (
+    "tags",
+    "tickets",
+    "transcripts",
+    "clientPoints",
+    "middlemen",       # permanent MM leaderboard
+    "weeklyQuota",     # separate collection for weekly quota tracking
+    "boards",          # (guild, board) -> message ID of leaderboards / panels
+    "vouchChannels",   # middleman -> vouch server/channel (+ optional keywords)
+    "vouchProgress",   # ticket channel -> users who vouched so far (TTL on updatedAt)
+    "pointsLedger",    # ticket ID -> users credited (makes point logging idempotent)
+    "closeJobs",       # queued / failed ticket-close pipelines (cogs/close_jobs.py)
+    "stickyMessages",  # channel -> sticky text + ID of the current sticky message
+)
+
+# env var -> (MongoClient option, type). Unset vars keep the driver default.
+_CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_COMPRESSORS": ("compressors", str),          # e.g. "zstd,snappy,zlib"
+    "MONGO_READ_PREFERENCE": ("readPreference", str),   # e.g. "primaryPreferred"
+    "MONGO_APP_NAME": ("appname", str),
+}
+
+# Keep a couple of sockets open so the first interaction after boot is warm
+_DEFAULT_OPTIONS = {"minPoolSize": 2, "appname": "azan-middleman"}
+
+
+def client_options() -> dict:
+    """Builds MongoClient keyword arguments from the environment."""
+    options = dict(_DEFAULT_OPTIONS)
+    for env, (option, cast) in _CLIENT_OPTIONS.items():
+        value = os.getenv(env)
+        if value:
+            options[option] = cast(value)
+    return options
 
 
 async def get_db():
@@ -20,24 +64,33 @@ async def get_db():
             "MONGO_URI is missing or invalid. Must start with 'mongodb://' or 'mongodb+srv://'"
         )
 
-    _mongo = AsyncIOMotorClient(uri)
+    _mongo = AsyncIOMotorClient(uri, **client_options())
     _db = _mongo["ticketbot"]  # Database name
     return _db
 
 
+async def warm_up():
+    """
+    Connects and pings the server so DNS, TLS and the handshake happen
+    before the gateway connects. Call once from bot.main().
+    """
+    db = await get_db()
+    await db.command("ping")
+    await collections()
+    print(f"🍃 MongoDB connected ({db.name})")
+
+
 async def collections():
     """
     Returns a dict of all collections used by the bot.
+    The dict is built once and shared; don't mutate it.
     Example usage:
         colls = await collections()
         await colls['tickets'].find_one({...})
     """
-    db = await get_db()
-    return {
-        "tags": db["tags"],
-        "tickets": db["tickets"],
-        "transcripts": db["transcripts"],
-        "clientPoints": db["clientPoints"],
-        "middlemen": db["middlemen"],       # permanent MM leaderboard
-        "weeklyQuota": db["weeklyQuota"],   # separate collection for weekly quota tracking
-    }
\ No newline at end of file
+    global _collections
+    if _collections is None:
+        db = await get_db()
+        _collections = {name: db[name] for name in COLLECTION_NAMES}
+    return _collections
+
@@ -0,0 +1,105 @@
+import time
+import asyncio
+import discord
+
+# Message router: bot.on_message hands every message to dispatch(), which
+# looks up the handlers subscribed to its channel / guild instead of waking
+# every listener for every message.
+
+# name -> {"handler", "channels": set, "guilds": set, "everywhere": bool}
+_subs: dict[str, dict] = {}
+_by_channel: dict[int, list[str]] = {}
+_by_guild: dict[int, list[str]] = {}
+_everywhere: list[str] = []
+
+# name -> {"calls", "errors", "total_ms", "max_ms", "last_ms"}
+_stats: dict[str, dict] = {}
+_tasks: set[asyncio.Task] = set()
+
+
+def _reindex():
+    _by_channel.clear()
+    _by_guild.clear()
+    _everywhere.clear()
+    for name, sub in _subs.items():
+        if sub["everywhere"]:
+            _everywhere.append(name)
+        for channel_id in sub["channels"]:
+            _by_channel.setdefault(channel_id, []).append(name)
+        for guild_id in sub["guilds"]:
+            _by_guild.setdefault(guild_id, []).append(name)
+
+
+def subscribe(name: str, handler, *, channels=(), guilds=(), everywhere: bool = False):
+    """
+    Routes non-bot messages in `channels` / `guilds` (or all of them with
+    everywhere=True) to `handler(message)`. Subscribing an existing name
+    replaces its routes, so cogs call this again whenever their channels change.
+    """
+    _subs[name] = {
+        "handler": handler,
+        "channels": {int(c) for c in channels},
+        "guilds": {int(g) for g in guilds},
+        "everywhere": everywhere,
+    }
+    _stats.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0})
+    _reindex()
+
+
+def unsubscribe(name: str):
+    if _subs.pop(name, None) is not None:
+        _reindex()
+
+
+def handlers_for(message: discord.Message) -> list[str]:
+    names = list(_by_channel.get(message.channel.id, ()))
+    if message.guild is not None:
+        names += [n for n in _by_guild.get(message.guild.id, ()) if n not in names]
+    names += [n for n in _everywhere if n not in names]
+    return names
+
+
+async def _run(name: str, handler, message: discord.Message):
+    stats = _stats[name]
+    start = time.perf_counter()
+    try:
+        await handler(message)
+    except Exception as e:
+        stats["errors"] += 1
+        print(f"[Dispatch] ❌ {name} failed on message {message.id}: {e}")
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stats["calls"] += 1
+        stats["total_ms"] += elapsed
+        stats["last_ms"] = elapsed
+        stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+
+def dispatch(message: discord.Message) -> int:
+    """
+    Starts the subscribed handlers for `message`, each in its own task so a
+    slow one doesn't hold up the rest (same as discord.py listeners).
+    Returns how many were started.
+    """
+    if message.author.bot:
+        return 0
+    names = handlers_for(message)
+    for name in names:
+        task = asyncio.create_task(_run(name, _subs[name]["handler"], message))
+        _tasks.add(task)
+        task.add_done_callback(_tasks.discard)
+    return len(names)
+
+
+def stats() -> list[tuple[str, dict]]:
+    """Per-handler latency, slowest average first."""
+    return sorted(
+        _stats.items(),
+        key=lambda kv: kv[1]["total_ms"] / kv[1]["calls"] if kv[1]["calls"] else 0.0,
+        reverse=True
+    )
+
+
+def reset_stats():
+    for entry in _stats.values():
+        entry.update(calls=0, errors=0, total_ms=0.0, max_ms=0.0, last_ms=0.0)
@@ -0,0 +1,99 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from utils.db import collections
+from utils.vouch_state import TTL_SECONDS as VOUCH_STATE_TTL
+
+# collection -> indexes the bot's hot queries rely on
+REQUIRED_INDEXES: dict[str, list[IndexModel]] = {
+    "tickets": [
+        # claim, close, $format, the W button and the vouch path
+        IndexModel([("channelId", ASCENDING)], name="channelId_1"),
+        # _count_user_tickets: $or on user1 / user2 (one index per branch)
+        IndexModel([("user1", ASCENDING)], name="user1_1"),
+        IndexModel([("user2", ASCENDING)], name="user2_1"),
+    ],
+    "clientPoints": [
+        # unique: concurrent upserts for a new client can't create two documents
+        IndexModel([("userId", ASCENDING)], name="userId_1", unique=True),
+        IndexModel([("points", DESCENDING)], name="points_-1"),
+    ],
+    "middlemen": [
+        IndexModel([("completed", DESCENDING)], name="completed_-1"),
+    ],
+    "weeklyQuota": [
+        IndexModel([("week", ASCENDING)], name="week_1"),
+    ],
+    "closeJobs": [
+        # CloseJobs._claim: next due job
+        IndexModel([("status", ASCENDING), ("runAt", ASCENDING)], name="status_1_runAt_1"),
+    ],
+    "vouchProgress": [
+        # Abandoned tickets' progress expires on its own
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt_ttl", expireAfterSeconds=VOUCH_STATE_TTL),
+    ],
+}
+
+
+def _key(spec) -> tuple:
+    return tuple((field, int(direction)) if isinstance(direction, (int, float)) else (field, direction)
+                 for field, direction in spec)
+
+
+async def _index_usage(coll) -> dict[str, int]:
+    """Index name -> ops since the server last restarted (empty if $indexStats isn't allowed)."""
+    try:
+        stats = await coll.aggregate([{"$indexStats": {}}]).to_list(length=None)
+    except Exception:
+        return {}
+    return {s["name"]: int(s.get("accesses", {}).get("ops", 0)) for s in stats}
+
+
+async def ensure_indexes() -> dict:
+    """
+    Creates any declared index that doesn't exist yet (matched by key, so
+    re-running is a no-op) and reports indexes that are undeclared or unused.
+    """
+    colls = await collections()
+    report = {}
+    for name, models in REQUIRED_INDEXES.items():
+        coll = colls[name]
+        info = await coll.index_information()
+        existing = {_key(idx["key"]): idx_name for idx_name, idx in info.items()}
+
+        created, failed = [], []
+        for model in models:
+            doc = model.document
+            key = _key(doc["key"].items())
+            if key in existing:
+                old_name = existing[key]
+                if not doc.get("unique") or info[old_name].get("unique"):
+                    continue
+                # Declared unique but built without it: rebuild, keeping the old index if that fails
+                await coll.drop_index(old_name)
+                try:
+                    await coll.create_indexes([model])
+                    created.append(doc["name"])
+                except Exception as e:
+                    await coll.create_indexes([IndexModel(list(doc["key"].items()), name=old_name)])
+                    failed.append(f"{doc['name']} ({e})")
+                continue
+            try:
+                await coll.create_indexes([model])
+                created.append(doc["name"])
+            except Exception as e:
+                failed.append(f"{doc['name']} ({e})")
+
+        declared = {_key(m.document["key"].items()) for m in models}
+        extra = [idx_name for key, idx_name in existing.items() if key not in declared and idx_name != "_id_"]
+        usage = await _index_usage(coll)
+        unused = [idx_name for idx_name, ops in usage.items() if ops == 0 and idx_name != "_id_"]
+
+        report[name] = {"created": created, "failed": failed, "undeclared": extra, "unused": unused}
+        if created:
+            print(f"[Indexes] {name}: created {', '.join(created)}")
+        if failed:
+            print(f"[Indexes] ❌ {name}: could not create {', '.join(failed)}")
+        if extra:
+            print(f"[Indexes] {name}: undeclared indexes {', '.join(extra)}")
+        if unused:
+            print(f"[Indexes] {name}: unused since server start {', '.join(unused)}")
+    return report
@@ -0,0 +1,95 @@
+import os
+import json
+import atexit
+import asyncio
+import tempfile
+import threading
+
+
+class JsonStore:
+    """
+    A JSON file kept in memory.
+
+    The file is read once; reads are served from RAM. Writes mark the store
+    dirty and a single flush runs `flush_delay` seconds later, so a burst of
+    saves costs one disk write. Flushes write a temp file and os.replace() it,
+    so a crash never leaves a half-written file. Pending changes are also
+    flushed at interpreter exit.
+    """
+
+    def __init__(self, path: str, flush_delay: float = 2.0, indent: int | None = 4):
+        self.path = path
+        self.flush_delay = flush_delay
+        self.indent = indent
+        self._data: dict | None = None
+        self._generation = 0       # bumped on every change
+        self._written = 0          # generation currently on disk
+        self._flush_handle = None
+        self._write_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    # ------------------------- Reads -------------------------
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r", encoding="utf-8") as f:
+            raw = f.read()
+        return json.loads(raw) if raw.strip() else {}
+
+    # ------------------------- Writes -------------------------
+    def mark_dirty(self):
+        """Call after mutating `data`; schedules a debounced flush."""
+        self._generation += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()  # no event loop (scripts, shutdown): write straight away
+            return
+        if self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_delay, self._flush_later, loop)
+
+    def _flush_later(self, loop: asyncio.AbstractEventLoop):
+        self._flush_handle = None
+        # Serialize on the loop thread so the dict can't change mid-dump,
+        # then hand the disk write to the default executor
+        generation, payload = self._snapshot()
+        loop.run_in_executor(None, self._write, generation, payload)
+
+    def _snapshot(self) -> tuple[int, str]:
+        return self._generation, json.dumps(self.data, indent=self.indent)
+
+    def _write(self, generation: int, payload: str):
+        with self._write_lock:
+            if generation <= self._written:
+                return  # a newer snapshot already reached disk
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except Exception:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            self._written = generation
+
+    def flush(self):
+        """Writes pending changes synchronously."""
+        if self._data is None or self._generation <= self._written:
+            return
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._write(*self._snapshot())
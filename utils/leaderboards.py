@@ -0,0 +1,94 @@
+import asyncio
+from bisect import insort
+from utils.db import collections
+
+# Rows kept ordered per leaderboard (what the boards show)
+TOP_N = 10
+
+
+class TopN:
+    """
+    Every member's score in a dict plus the best `size` entries kept sorted.
+
+    Scores only ever go up between reseeds (points / completions are +1), so
+    an increment either moves a member inside the top list or lets it push
+    out the last entry: O(log n) to place, nothing else is touched.
+    """
+
+    def __init__(self, size: int = TOP_N):
+        self.size = size
+        self.scores: dict = {}
+        self._top: list[tuple[int, str, object]] = []   # (-score, str(key), key)
+
+    def seed(self, items):
+        self.scores = dict(items)
+        ranked = sorted((-score, str(key), key) for key, score in self.scores.items())
+        self._top = ranked[:self.size]
+
+    def add(self, key, delta: int = 1):
+        old = self.scores.get(key, 0)
+        new = old + delta
+        self.scores[key] = new
+        entry = (-new, str(key), key)
+        try:
+            self._top.remove((-old, str(key), key))
+        except ValueError:
+            if len(self._top) >= self.size and entry >= self._top[-1]:
+                return
+        insort(self._top, entry)
+        del self._top[self.size:]
+
+    def top(self) -> list[tuple[object, int]]:
+        return [(key, -neg) for neg, _, key in self._top]
+
+
+class Leaderboard:
+    """A TopN seeded once from a Mongo collection and kept current by callers' increments."""
+
+    def __init__(self, collection: str, key_field: str, score_field: str):
+        self.collection = collection
+        self.key_field = key_field
+        self.score_field = score_field
+        self._board = TopN()
+        self._loaded = False
+        self._loading = False
+        self._stale = False
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._lock:
+            while not self._loaded:
+                self._loading, self._stale = True, False
+                try:
+                    colls = await collections()
+                    cursor = colls[self.collection].find({}, {self.key_field: 1, self.score_field: 1})
+                    items = [(doc.get(self.key_field), doc.get(self.score_field, 0) or 0) async for doc in cursor]
+                finally:
+                    self._loading = False
+                self._board.seed((key, score) for key, score in items if key is not None)
+                # An increment raced the scan; it may or may not be in what we read
+                self._loaded = not self._stale
+            print(f"[Leaderboards] {self.collection}: seeded {len(self._board.scores)} entries.")
+
+    def record(self, key, delta: int = 1):
+        """Call after the matching $inc succeeded in Mongo."""
+        if self._loaded:
+            self._board.add(key, delta)
+        elif self._loading:
+            self._stale = True
+
+    def invalidate(self):
+        """After bulk resets: the next read reseeds from Mongo."""
+        self._loaded = False
+        if self._loading:
+            self._stale = True
+
+    async def top(self) -> list[tuple[object, int]]:
+        await self.ensure_loaded()
+        return self._board.top()
+
+
+clients = Leaderboard("clientPoints", "userId", "points")
+middlemen = Leaderboard("middlemen", "_id", "completed")
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from utils.db import collections
+from utils import leaderboards
+
+# How long one caller owns a pending ledger row before a retry may take it over
+LEDGER_LOCK = timedelta(seconds=60)
+
+
+async def top_clients() -> list[dict]:
+    """Top clients by points, from the in-memory leaderboard (no query once seeded)."""
+    return [{"userId": uid, "points": pts} for uid, pts in await leaderboards.clients.top()]
+
+
+async def _claim_pending(ledger, ticket_id: str, now: datetime) -> dict | None:
+    """Takes over a ledger row whose increments never finished (None if applied or in progress)."""
+    return await ledger.find_one_and_update(
+        {"_id": ticket_id, "status": "pending", "lockedUntil": {"$lt": now}},
+        {"$set": {"lockedUntil": now + LEDGER_LOCK}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def _mark_applied(ledger, ticket_id: str, applied: list[str], done: bool):
+    """Records who got their point so a retry doesn't credit them twice."""
+    update = {"$addToSet": {"applied": {"$each": applied}}, "$set": {"lockedUntil": datetime.utcnow()}}
+    if done:
+        update["$set"]["status"] = "applied"
+    await ledger.update_one({"_id": ticket_id}, update)
+    for uid in applied:
+        leaderboards.clients.record(uid)
+
+
+async def credit_ticket(ticket_id, user_ids) -> tuple[list[str], list[dict]]:
+    """
+    Gives every user in a ticket one point, at most once per ticket.
+
+    The ticket is first recorded in pointsLedger (its _id is the ticket ID) as
+    "pending", then the increments go out in one bulk_write and the row is
+    flipped to "applied". A row left pending by a failed write is picked up
+    again by the next call (close-queue retry or the Log Points button), which
+    applies only the users not already marked as applied.
+    Returns (user IDs credited — empty if the ticket was already logged, top clients).
+    """
+    user_ids = list(dict.fromkeys(str(uid) for uid in user_ids if uid))
+    colls = await collections()
+    if not user_ids:
+        return [], await top_clients()
+
+    ledger = colls["pointsLedger"]
+    ticket_id = str(ticket_id)
+    now = datetime.utcnow()
+    try:
+        await ledger.insert_one({
+            "_id": ticket_id,
+            "users": user_ids,
+            "applied": [],
+            "status": "pending",
+            "lockedUntil": now + LEDGER_LOCK,
+            "createdAt": now,
+        })
+    except DuplicateKeyError:
+        row = await _claim_pending(ledger, ticket_id, now)
+        if not row:
+            return [], await top_clients()
+        user_ids = [uid for uid in row["users"] if uid not in row.get("applied", [])]
+
+    try:
+        if user_ids:
+            await colls["clientPoints"].bulk_write([
+                UpdateOne({"userId": uid}, {"$inc": {"points": 1}, "$setOnInsert": {"userId": uid}}, upsert=True)
+                for uid in user_ids
+            ], ordered=False)
+    except BulkWriteError as e:
+        failed = {user_ids[err["index"]] for err in e.details.get("writeErrors", [])}
+        await _mark_applied(ledger, ticket_id, [uid for uid in user_ids if uid not in failed], done=False)
+        raise
+    except Exception:
+        # Outcome unknown: release the row so the next attempt can take it over
+        await ledger.update_one({"_id": ticket_id}, {"$set": {"lockedUntil": datetime.utcnow()}})
+        raise
+    await _mark_applied(ledger, ticket_id, user_ids, done=True)
+    return user_ids, await top_clients()
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from utils.db import collections
+from utils import leaderboards
+
+# Bumped on every quota write made through this module, so readers can
+# tell whether a cached copy of weeklyQuota is still current
+_version = 0
+
+
+def version() -> int:
+    return _version
+
+
+def _bump():
+    global _version
+    _version += 1
+
+
+def current_week() -> int:
+    """ISO week number used by the quota board and the Monday rollover."""
+    return datetime.utcnow().isocalendar()[1]
+
+
+# Job IDs remembered per document so a retried close can't credit twice;
+# only the most recent ones are kept (a job is never retried that late)
+CREDITED_JOBS_KEPT = 100
+
+
+def _quota_increment(week: int, job_id: str | None = None) -> list[dict]:
+    # Same week → completed + 1; new (or missing) week → start again at 1.
+    # Runs as one pipeline update, so concurrent closes can't lose a count.
+    fields = {
+        "completed": {
+            "$cond": [
+                {"$eq": ["$week", week]},
+                {"$add": [{"$ifNull": ["$completed", 0]}, 1]},
+                1,
+            ]
+        },
+        "week": week,
+    }
+    if job_id is not None:
+        fields["creditedJobs"] = {"$slice": [
+            {"$concatArrays": [{"$ifNull": ["$creditedJobs", []]}, [job_id]]},
+            -CREDITED_JOBS_KEPT,
+        ]}
+    return [{"$set": fields}]
+
+
+async def _guarded_update(coll, mm_id, update, job_id: str | None) -> bool:
+    """
+    Applies `update` once per job: the filter skips documents that already
+    list job_id, and the upsert that follows hits a duplicate _id instead of
+    creating a second document. Returns False if the job was already credited.
+    """
+    query = {"_id": mm_id}
+    if job_id is not None:
+        query["creditedJobs"] = {"$ne": job_id}
+    try:
+        await coll.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def credit_middleman(mm_id, job_id: str | None = None) -> int:
+    """
+    Credits one completed trade to a middleman: +1 on the all-time
+    leaderboard and +1 on this week's quota (rolling the week over if needed).
+    Both writes are single atomic updates sent concurrently. With `job_id`
+    each write happens at most once for that job, so a resumed close job
+    doesn't count the trade again. Returns the week.
+    """
+    try:
+        mm_id = int(mm_id)
+    except (TypeError, ValueError):
+        pass
+
+    week = current_week()
+    colls = await collections()
+    mm_update = {"$inc": {"completed": 1}, "$set": {"week": week}}
+    if job_id is not None:
+        mm_update["$push"] = {"creditedJobs": {"$each": [job_id], "$slice": -CREDITED_JOBS_KEPT}}
+    mm_credited, _ = await asyncio.gather(
+        _guarded_update(colls["middlemen"], mm_id, mm_update, job_id),
+        _guarded_update(colls["weeklyQuota"], mm_id, _quota_increment(week, job_id), job_id),
+    )
+    _bump()
+    if mm_credited:
+        leaderboards.middlemen.record(mm_id)
+    return week
+
+
+async def rollover_week() -> tuple[int, int]:
+    """
+    Resets every quota left over from an earlier week in one update_many.
+    Idempotent; returns (week, documents modified).
+    """
+    week = current_week()
+    colls = await collections()
+    result = await colls["weeklyQuota"].update_many(
+        {"week": {"$ne": week}},
+        {"$set": {"completed": 0, "week": week}}
+    )
+    if result.modified_count:
+        _bump()
+    return week, result.modified_count
@@ -0,0 +1,279 @@
+import time
+import asyncio
+from collections import OrderedDict
+from urllib.parse import urlsplit
+import aiohttp
+
+USERS_API = "https://users.roblox.com"
+FRIENDS_API = "https://friends.roblox.com"
+THUMBNAILS_API = "https://thumbnails.roblox.com"
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # seconds, doubled per retry unless Retry-After says otherwise
+# A lookup gives up instead of sleeping past this many seconds in total
+RETRY_BUDGET = 8.0
+# Lookups arriving within this window share one batched request
+BATCH_WINDOW = 0.01  # seconds
+BATCH_MAX = 100      # ids/usernames per request
+
+_session: aiohttp.ClientSession | None = None
+# host -> monotonic time until which requests to it should wait (after a 429)
+_cooldowns: dict[str, float] = {}
+
+
+class TTLCache:
+    """Small LRU cache whose entries expire `ttl` seconds after being set."""
+
+    def __init__(self, ttl: float, maxsize: int = 2048):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        item = self._items.get(key)
+        if item is None:
+            return default
+        expires, value = item
+        if expires < time.monotonic():
+            del self._items[key]
+            return default
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self._items[key] = (time.monotonic() + self.ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+_user_ids = TTLCache(ttl=60 * 60)       # lowercased username -> user ID
+_profiles = TTLCache(ttl=5 * 60)        # user ID -> users.roblox.com/v1/users/{id}
+_headshots = TTLCache(ttl=15 * 60)      # (user ID, size, circular) -> image URL
+_follow_counts = TTLCache(ttl=5 * 60)   # user ID -> (followers, following)
+
+
+# ------------------------- HTTP -------------------------
+def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return _session
+
+
+async def close():
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+def _retry_after(resp: aiohttp.ClientResponse, attempt: int) -> float:
+    try:
+        return max(float(resp.headers.get("Retry-After", "")), 0.0)
+    except ValueError:
+        return BACKOFF_BASE * (2 ** attempt)
+
+
+async def request_json(method: str, url: str, **kwargs) -> tuple[int, dict | None]:
+    """
+    Sends a request through the shared session and returns (status, json).
+    429 and 5xx responses are retried with backoff (at most RETRY_BUDGET
+    seconds of waiting in total); a 429 also pauses every other request to
+    the same host until Retry-After has passed.
+    """
+    host = urlsplit(url).netloc
+    session = _get_session()
+    status = 0
+    give_up_at = time.monotonic() + RETRY_BUDGET
+    for attempt in range(MAX_RETRIES + 1):
+        wait = _cooldowns.get(host, 0) - time.monotonic()
+        if wait > 0:
+            if time.monotonic() + wait > give_up_at:
+                return 429, None
+            await asyncio.sleep(wait)
+
+        async with session.request(method, url, **kwargs) as resp:
+            status = resp.status
+            if status == 429 or status >= 500:
+                delay = _retry_after(resp, attempt)
+                if status == 429:
+                    _cooldowns[host] = time.monotonic() + delay
+                if attempt < MAX_RETRIES and time.monotonic() + delay <= give_up_at:
+                    await asyncio.sleep(delay)
+                    continue
+                return status, None
+            try:
+                data = await resp.json(content_type=None)
+            except Exception:
+                data = None
+            return status, data
+    return status, None
+
+
+# ------------------------- Batching -------------------------
+class Coalescer:
+    """
+    Collects keys requested within `window` seconds and resolves them with a
+    single `fetch_many(keys) -> {key: value}` call. Each caller gets its own
+    value back; duplicate keys in a window share one slot in the request.
+    """
+
+    def __init__(self, fetch_many, window: float = BATCH_WINDOW, max_batch: int = BATCH_MAX):
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: dict = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def get(self, key):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: dict):
+        try:
+            results = await self.fetch_many(list(batch))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(results.get(key))
+
+
+async def _fetch_user_ids(usernames: list[str]) -> dict[str, int]:
+    status, data = await request_json(
+        "POST", f"{USERS_API}/v1/usernames/users",
+        json={"usernames": usernames, "excludeBannedUsers": False},
+    )
+    if status != 200 or not data:
+        return {}
+    return {entry["requestedUsername"].lower(): entry["id"] for entry in data.get("data", [])}
+
+
+def _headshot_fetcher(size: str, circular: bool):
+    async def _fetch(user_ids: list[int]) -> dict[int, str]:
+        status, data = await request_json(
+            "GET", f"{THUMBNAILS_API}/v1/users/avatar-headshot",
+            params={
+                "userIds": ",".join(str(uid) for uid in user_ids),
+                "size": size,
+                "format": "Png",
+                "isCircular": str(circular).lower(),
+            },
+        )
+        if status != 200 or not data:
+            return {}
+        return {entry["targetId"]: entry.get("imageUrl") for entry in data.get("data", [])}
+    return _fetch
+
+
+_username_batches = Coalescer(_fetch_user_ids)
+_headshot_batches: dict[tuple, Coalescer] = {}  # (size, circular) -> Coalescer
+
+
+# ------------------------- Lookups -------------------------
+async def resolve_username(username: str) -> int | None:
+    """Username -> user ID, or None if Roblox doesn't know it."""
+    key = username.strip().lower()
+    cached = _user_ids.get(key)
+    if cached is not None:
+        return cached
+
+    user_id = await _username_batches.get(key)
+    if user_id is not None:
+        _user_ids.set(key, user_id)
+    return user_id
+
+
+async def resolve_user_id(query: str) -> int | None:
+    """Numeric queries are treated as IDs, anything else as a username."""
+    query = query.strip()
+    if query.isdigit():
+        return int(query)
+    return await resolve_username(query)
+
+
+async def get_profile(user_id: int) -> dict | None:
+    cached = _profiles.get(user_id)
+    if cached is not None:
+        return cached
+    status, data = await request_json("GET", f"{USERS_API}/v1/users/{user_id}")
+    if status != 200 or not data:
+        return None
+    _profiles.set(user_id, data)
+    return data
+
+
+async def get_headshot(user_id: int, size: str = "150x150", circular: bool = False) -> str | None:
+    key = (user_id, size, circular)
+    cached = _headshots.get(key)
+    if cached is not None:
+        return cached
+    batcher = _headshot_batches.get((size, circular))
+    if batcher is None:
+        batcher = _headshot_batches[(size, circular)] = Coalescer(_headshot_fetcher(size, circular))
+    url = await batcher.get(user_id)
+    if url:
+        _headshots.set(key, url)
+    return url
+
+
+async def get_follow_counts(user_id: int) -> tuple:
+    """(followers, following); "N/A" for a count Roblox didn't return."""
+    cached = _follow_counts.get(user_id)
+    if cached is not None:
+        return cached
+
+    async def _count(kind: str):
+        status, data = await request_json("GET", f"{FRIENDS_API}/v1/users/{user_id}/{kind}/count")
+        return data.get("count", "N/A") if status == 200 and data else "N/A"
+
+    counts = tuple(await asyncio.gather(_count("followers"), _count("followings")))
+    if "N/A" not in counts:
+        _follow_counts.set(user_id, counts)
+    return counts
+
+
+async def get_user_bundle(user_id: int, headshot_size: str = "150x150",
+                          circular: bool = False, follows: bool = False) -> dict:
+    """
+    Fetches the profile, headshot and (optionally) follow counts concurrently.
+    Returns {"id", "profile", "headshot", "followers", "following"}.
+    """
+    tasks = [get_profile(user_id), get_headshot(user_id, headshot_size, circular)]
+    if follows:
+        tasks.append(get_follow_counts(user_id))
+    results = await asyncio.gather(*tasks)
+    followers, following = results[2] if follows else ("N/A", "N/A")
+    return {
+        "id": user_id,
+        "profile": results[0],
+        "headshot": results[1],
+        "followers": followers,
+        "following": following,
+    }
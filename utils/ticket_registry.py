@@ -0,0 +1,133 @@
+import asyncio
+from utils.db import collections
+
+# channel_id -> {"user1": int | None, "user2": int | None, "claimedBy": int | None}
+_tickets: dict[int, dict] = {}
+# user_id -> channel_ids the user has access to as a trader or claimer
+_by_user: dict[int, set[int]] = {}
+# middleman ID -> channel_ids they claimed, oldest claim first (dict as ordered set)
+_by_claimer: dict[int, dict[int, None]] = {}
+# user_ids currently going through ticket creation (guards double submits)
+_pending: set[int] = set()
+
+_loaded = False
+_load_lock = asyncio.Lock()
+
+
+def _as_int(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _members(entry: dict) -> set[int]:
+    return {uid for uid in (entry.get("user1"), entry.get("user2"), entry.get("claimedBy")) if uid}
+
+
+def _index(channel_id: int, entry: dict):
+    _tickets[channel_id] = entry
+    for uid in _members(entry):
+        _by_user.setdefault(uid, set()).add(channel_id)
+    if entry.get("claimedBy"):
+        _by_claimer.setdefault(entry["claimedBy"], {})[channel_id] = None
+
+
+def _unindex(channel_id: int):
+    entry = _tickets.pop(channel_id, None)
+    if not entry:
+        return
+    for uid in _members(entry):
+        channels = _by_user.get(uid)
+        if channels:
+            channels.discard(channel_id)
+            if not channels:
+                del _by_user[uid]
+    claimed = _by_claimer.get(entry.get("claimedBy"))
+    if claimed is not None:
+        claimed.pop(channel_id, None)
+        if not claimed:
+            del _by_claimer[entry["claimedBy"]]
+
+
+async def ensure_loaded():
+    """
+    Builds the registry from the tickets collection the first time it is needed.
+    Safe to call from every code path; only the first call hits Mongo.
+    """
+    global _loaded
+    if _loaded:
+        return
+    async with _load_lock:
+        if _loaded:
+            return
+        colls = await collections()
+        cursor = colls["tickets"].find({}, {"channelId": 1, "user1": 1, "user2": 1, "claimedBy": 1})
+        async for doc in cursor:
+            channel_id = _as_int(doc.get("channelId") or doc.get("_id"))
+            if channel_id:
+                _index(channel_id, {
+                    "user1": _as_int(doc.get("user1")),
+                    "user2": _as_int(doc.get("user2")),
+                    "claimedBy": _as_int(doc.get("claimedBy")),
+                })
+        _loaded = True
+        print(f"[TicketRegistry] Loaded {len(_tickets)} open tickets.")
+
+
+# ------------------------- Lookups -------------------------
+def open_ticket_for(user_id: int) -> int | None:
+    """Returns a channel ID the user already has a ticket in, or None."""
+    channels = _by_user.get(user_id)
+    return next(iter(channels)) if channels else None
+
+
+def get_ticket(channel_id: int) -> dict | None:
+    return _tickets.get(channel_id)
+
+
+def claimed_ticket(mm_id: int) -> tuple[int, dict] | None:
+    """The oldest open ticket claimed by mm_id as (channel_id, entry), or None."""
+    claimed = _by_claimer.get(mm_id)
+    if not claimed:
+        return None
+    channel_id = next(iter(claimed))
+    return channel_id, _tickets[channel_id]
+
+
+# ------------------------- Creation guard -------------------------
+def reserve(user_id: int) -> bool:
+    """
+    Claims the right to create a ticket for user_id.
+    Check and set happen without an await in between, so two rapid submits
+    can't both pass. Returns False if the user has a ticket or one is being made.
+    """
+    if user_id in _pending or _by_user.get(user_id):
+        return False
+    _pending.add(user_id)
+    return True
+
+
+def release(user_id: int):
+    _pending.discard(user_id)
+
+
+# ------------------------- Lifecycle hooks -------------------------
+def add_ticket(channel_id: int, user1, user2=None, claimed_by=None):
+    _unindex(channel_id)
+    _index(channel_id, {
+        "user1": _as_int(user1),
+        "user2": _as_int(user2),
+        "claimedBy": _as_int(claimed_by),
+    })
+
+
+def set_claimed(channel_id: int, claimed_by):
+    entry = dict(_tickets.get(channel_id) or {"user1": None, "user2": None})
+    entry["claimedBy"] = _as_int(claimed_by)
+    _unindex(channel_id)
+    _index(channel_id, entry)
+
+
+def remove_ticket(channel_id: int):
+    _unindex(channel_id)
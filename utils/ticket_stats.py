@@ -1,25 +1,29 @@
-import json, os
+from utils.json_store import JsonStore
 
 STATS_FILE = "db/ticket_stats.json"
 
+# Counts live in memory; creations are persisted in batched, atomic flushes
+_store = JsonStore(STATS_FILE)
+
 def load_ticket_stats():
-    if not os.path.exists(STATS_FILE):
-        return {}
-    with open(STATS_FILE, "r") as f:
-        return json.load(f)
+    return _store.data
 
 def save_ticket_stats(stats):
-    with open(STATS_FILE, "w") as f:
-        json.dump(stats, f, indent=4)
+    data = _store.data
+    if stats is not data:
+        data.clear()
+        data.update(stats)
+    _store.mark_dirty()
 
-def increment_ticket_count(user_id: int):
-    stats = load_ticket_stats()
-    uid = str(user_id)
-    if uid not in stats:
-        stats[uid] = {"total": 0}
-    stats[uid]["total"] += 1
-    save_ticket_stats(stats)
+def increment_ticket_count(user_id: int, amount: int = 1):
+    entry = _store.data.setdefault(str(user_id), {"total": 0})
+    entry["total"] = entry.get("total", 0) + amount
+    _store.mark_dirty()
 
 def get_ticket_count(user_id: int) -> int:
-    stats = load_ticket_stats()
-    return stats.get(str(user_id), {}).get("total", 0)
\ No newline at end of file
+    return _store.data.get(str(user_id), {}).get("total", 0)
+
+def get_ticket_counts(*user_ids: int) -> dict[int, int]:
+    """Bulk read: {user_id: total} for every ID passed (0 when unknown)."""
+    data = _store.data
+    return {uid: data.get(str(uid), {}).get("total", 0) for uid in user_ids}
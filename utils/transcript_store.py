@@ -0,0 +1,198 @@
+import os
+import re
+import gzip
+import json
+import hashlib
+import tempfile
+
+try:
+    import brotli  # optional: adds .br variants next to the .gz ones
+except ImportError:
+    brotli = None
+
+STORE_ROOT = os.path.join(os.getcwd(), "transcripts")
+OBJECTS_DIR = os.path.join(STORE_ROOT, "objects")  # objects/<ab>/<sha256>.gz|.br
+REFS_DIR = os.path.join(STORE_ROOT, "refs")        # refs/<ab>/<name>.json -> object digest
+SPOOL_DIR = os.path.join(STORE_ROOT, "spool")      # scratch files before they are stored
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+CHUNK_SIZE = 64 * 1024
+
+# Inline <style>/<script> blocks at least this big are split out and stored once
+ASSET_MIN_BYTES = 2048
+_INLINE_ASSET_RE = re.compile(
+    r"<(style|script)(\s[^>]*)?>(.*?)</\1>",
+    re.DOTALL | re.IGNORECASE,
+)
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+ASSET_TYPES = {"css": "text/css; charset=utf-8", "js": "application/javascript; charset=utf-8"}
+
+
+# ------------------------- Paths -------------------------
+def _shard(key: str) -> str:
+    return key[:2]
+
+
+def object_path(digest: str, encoding: str = "gzip") -> str:
+    ext = "br" if encoding == "br" else "gz"
+    return os.path.join(OBJECTS_DIR, _shard(digest), f"{digest}.{ext}")
+
+
+def _ref_path(name: str) -> str:
+    key = hashlib.sha1(name.encode("utf-8")).hexdigest()
+    return os.path.join(REFS_DIR, _shard(key), f"{name}.json")
+
+
+def ensure_dirs():
+    for path in (OBJECTS_DIR, REFS_DIR, SPOOL_DIR):
+        os.makedirs(path, exist_ok=True)
+
+
+def spool_path(name: str) -> str:
+    ensure_dirs()
+    return os.path.join(SPOOL_DIR, name)
+
+
+def is_digest(value: str) -> bool:
+    return bool(_DIGEST_RE.match(value))
+
+
+# ------------------------- Writes -------------------------
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _store_object(digest: str, data: bytes):
+    """Writes the compressed variants of data unless this digest is already stored."""
+    gz_path = object_path(digest, "gzip")
+    if not os.path.exists(gz_path):
+        _atomic_write(gz_path, gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0))
+    if brotli is not None:
+        br_path = object_path(digest, "br")
+        if not os.path.exists(br_path):
+            _atomic_write(br_path, brotli.compress(data, quality=BROTLI_QUALITY))
+
+
+def _write_ref(name: str, digest: str, content_type: str, size: int):
+    ref = {"digest": digest, "type": content_type, "size": size}
+    _atomic_write(_ref_path(name), json.dumps(ref).encode("utf-8"))
+
+
+def put_bytes(name: str, data: bytes, content_type: str) -> str:
+    """Stores data under its sha256, points `name` at it and returns the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    _store_object(digest, data)
+    _write_ref(name, digest, content_type, len(data))
+    return digest
+
+
+def put_file(name: str, src_path: str, content_type: str) -> str:
+    """Like put_bytes, but streams src_path so large TXT transcripts are never loaded whole."""
+    ensure_dirs()
+    sha = hashlib.sha256()
+    size = 0
+    fd, tmp_gz = tempfile.mkstemp(dir=SPOOL_DIR, suffix=".gz.tmp")
+    tmp_br = None
+    try:
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY) if brotli is not None else None
+        br_file = None
+        if compressor is not None:
+            br_fd, tmp_br = tempfile.mkstemp(dir=SPOOL_DIR, suffix=".br.tmp")
+            br_file = os.fdopen(br_fd, "wb")
+        with open(src_path, "rb") as src, os.fdopen(fd, "wb") as raw_gz:
+            with gzip.GzipFile(fileobj=raw_gz, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as gz:
+                while chunk := src.read(CHUNK_SIZE):
+                    sha.update(chunk)
+                    size += len(chunk)
+                    gz.write(chunk)
+                    if br_file:
+                        br_file.write(compressor.process(chunk))
+        if br_file:
+            br_file.write(compressor.finish())
+            br_file.close()
+
+        digest = sha.hexdigest()
+        for tmp, encoding in ((tmp_gz, "gzip"), (tmp_br, "br")):
+            if not tmp:
+                continue
+            final = object_path(digest, encoding)
+            if os.path.exists(final):
+                os.remove(tmp)  # identical content already stored
+            else:
+                os.makedirs(os.path.dirname(final), exist_ok=True)
+                os.replace(tmp, final)
+        _write_ref(name, digest, content_type, size)
+        return digest
+    except Exception:
+        for tmp in (tmp_gz, tmp_br):
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+
+
+def extract_assets(html: str, asset_url: str) -> str:
+    """
+    Moves large inline <style>/<script> blocks into shared, content-addressed
+    assets so identical CSS/JS across transcripts is stored and cached once.
+    `asset_url` is the public prefix assets are served from.
+    """
+    def _replace(match: re.Match) -> str:
+        tag, attrs, body = match.group(1).lower(), match.group(2) or "", match.group(3)
+        data = body.encode("utf-8")
+        if len(data) < ASSET_MIN_BYTES or "src=" in attrs.lower():
+            return match.group(0)
+        ext = "css" if tag == "style" else "js"
+        digest = hashlib.sha256(data).hexdigest()
+        _store_object(digest, data)
+        if tag == "style":
+            return f'<link rel="stylesheet" href="{asset_url}/{digest}.{ext}">'
+        return f'<script{attrs} src="{asset_url}/{digest}.{ext}"></script>'
+
+    return _INLINE_ASSET_RE.sub(_replace, html)
+
+
+def put_html(name: str, html: str, asset_url: str) -> str:
+    return put_bytes(name, extract_assets(html, asset_url).encode("utf-8"), "text/html; charset=utf-8")
+
+
+# ------------------------- Reads -------------------------
+def resolve(name: str) -> dict | None:
+    """Returns {"digest", "type", "size"} for a stored name, or None."""
+    try:
+        with open(_ref_path(name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_object(digest: str, encoding: str) -> bytes | None:
+    """
+    Returns the stored bytes in the requested encoding ("br", "gzip" or
+    "identity"), or None if that variant isn't on disk.
+    """
+    if encoding == "br":
+        path = object_path(digest, "br")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    path = object_path(digest, "gzip")
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = f.read()
+    return data if encoding == "gzip" else gzip.decompress(data)
@@ -0,0 +1,85 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+# Words plus a leading/trailing "+" so "+rep" and "rep+" survive tokenizing
+_TOKEN_RE = re.compile(r"\+?[^\W_]+\+?")
+
+
+def normalize(text: str) -> str:
+    """NFKD → drop combining marks → casefold, so "Ｖｏｕｃｈ" and "légit" match plain keywords."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return unicodedata.normalize("NFKC", stripped).casefold()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(normalize(text))
+
+
+class VouchMatcher:
+    """
+    Multi-keyword matcher compiled once per keyword list.
+
+    Keywords are split into tokens and indexed by their first token. A
+    message is tokenized once; each token is probed with its prefixes of the
+    indexed first-token lengths. The work per message depends on the message
+    length and the keyword length, not on how many keywords there are.
+
+    Matching starts on a word boundary and allows a suffix on the final word,
+    so "vouch" matches "vouched" but not "unvouchable", and "thanks mm"
+    matches "thanks mms" but not "thanksmm".
+    """
+
+    def __init__(self, keywords):
+        self._index: dict[str, list[tuple[str, ...]]] = {}
+        for keyword in keywords:
+            tokens = tokenize(keyword)
+            if tokens:
+                self._index.setdefault(tokens[0], []).append(tuple(tokens[1:]))
+        self._lengths = sorted({len(first) for first in self._index})
+
+    def __call__(self, content: str) -> bool:
+        return self.matches(content)
+
+    def matches(self, content: str) -> bool:
+        if not self._index or not content:
+            return False
+        tokens = tokenize(content)
+        index, lengths = self._index, self._lengths
+        for i, token in enumerate(tokens):
+            size = len(token)
+            for length in lengths:
+                if length > size:
+                    break
+                rests = index.get(token[:length] if length < size else token)
+                if not rests:
+                    continue
+                for rest in rests:
+                    if not rest:
+                        return True
+                    if length == size and self._follows(tokens, i + 1, rest):
+                        return True
+        return False
+
+    @staticmethod
+    def _follows(tokens: list[str], start: int, rest: tuple[str, ...]) -> bool:
+        end = start + len(rest)
+        if end > len(tokens):
+            return False
+        for offset, word in enumerate(rest[:-1]):
+            if tokens[start + offset] != word:
+                return False
+        return tokens[end - 1].startswith(rest[-1])
+
+
+@lru_cache(maxsize=256)
+def _compiled(keywords: tuple[str, ...]) -> VouchMatcher:
+    return VouchMatcher(keywords)
+
+
+def get_matcher(keywords) -> VouchMatcher:
+    """Returns a cached matcher for this keyword list (compiled on first use)."""
+    return _compiled(tuple(keywords))
@@ -0,0 +1,85 @@
+import asyncio
+from utils.db import collections
+
+# vouch channel ID -> {"mm_id": int, "guild_id": int, "keywords": list[str] | None}
+_routes: dict[int, dict] = {}
+# middleman ID -> vouch channel ID (one vouch channel per middleman)
+_by_mm: dict[int, int] = {}
+
+_loaded = False
+_load_lock = asyncio.Lock()
+
+
+def _index(mm_id: int, guild_id: int, channel_id: int, keywords=None):
+    old = _by_mm.pop(mm_id, None)
+    if old is not None:
+        _routes.pop(old, None)
+    _routes[channel_id] = {"mm_id": mm_id, "guild_id": guild_id, "keywords": keywords or None}
+    _by_mm[mm_id] = channel_id
+
+
+async def ensure_loaded(seed: dict | None = None):
+    """
+    Loads every middleman's vouch channel from the vouchChannels collection.
+    `seed` ({mm_id: {"server_id", "channel_id", "keywords"?}}) is inserted
+    for middlemen that have no document yet, so hard-coded defaults keep working.
+    Removed routes stay behind as disabled documents so a seed can't bring them back.
+    """
+    global _loaded
+    if _loaded:
+        return
+    async with _load_lock:
+        if _loaded:
+            return
+        colls = await collections()
+        coll = colls["vouchChannels"]
+        for mm_id, config in (seed or {}).items():
+            await coll.update_one(
+                {"_id": str(mm_id)},
+                {"$setOnInsert": {
+                    "serverId": str(config["server_id"]),
+                    "channelId": str(config["channel_id"]),
+                    "keywords": config.get("keywords"),
+                }},
+                upsert=True
+            )
+        async for doc in coll.find({"disabled": {"$ne": True}}):
+            _index(int(doc["_id"]), int(doc["serverId"]), int(doc["channelId"]), doc.get("keywords"))
+        _loaded = True
+        print(f"[VouchRoutes] Loaded {len(_routes)} vouch channels.")
+
+
+def channel_ids() -> list[int]:
+    return list(_routes)
+
+
+def route(guild_id: int, channel_id: int) -> dict | None:
+    """O(1): the route for a message's channel, or None if it isn't a vouch channel."""
+    entry = _routes.get(channel_id)
+    if entry and entry["guild_id"] == guild_id:
+        return entry
+    return None
+
+
+async def set_route(mm_id: int, guild_id: int, channel_id: int, keywords=None):
+    colls = await collections()
+    await colls["vouchChannels"].update_one(
+        {"_id": str(mm_id)},
+        {"$set": {"serverId": str(guild_id), "channelId": str(channel_id), "keywords": keywords or None,
+                  "disabled": False}},
+        upsert=True
+    )
+    _index(mm_id, guild_id, channel_id, keywords)
+
+
+async def remove_route(mm_id: int) -> bool:
+    colls = await collections()
+    # Tombstone rather than delete: ensure_loaded would re-seed a missing document
+    result = await colls["vouchChannels"].update_one(
+        {"_id": str(mm_id), "disabled": {"$ne": True}},
+        {"$set": {"disabled": True}}
+    )
+    channel_id = _by_mm.pop(mm_id, None)
+    if channel_id is not None:
+        _routes.pop(channel_id, None)
+    return result.modified_count > 0 or channel_id is not None
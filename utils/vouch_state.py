@@ -0,0 +1,72 @@
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from utils.db import collections
+
+# Tickets whose vouch progress is kept in memory (least recently used evicted first)
+MAX_TICKETS = int(os.getenv("VOUCH_STATE_MAX_TICKETS", "500"))
+# Progress untouched for this long is dropped from memory and (via TTL index) from Mongo
+TTL_SECONDS = int(os.getenv("VOUCH_STATE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# ticket channel ID -> (user IDs who vouched, last touched monotonic time)
+_state: "OrderedDict[int, tuple[set[str], float]]" = OrderedDict()
+
+
+def _put(channel_id: int, vouched: set[str]):
+    _state[channel_id] = (vouched, time.monotonic())
+    _state.move_to_end(channel_id)
+    while len(_state) > MAX_TICKETS:
+        _state.popitem(last=False)
+
+
+def _cached(channel_id: int) -> set[str] | None:
+    item = _state.get(channel_id)
+    if item is None:
+        return None
+    vouched, touched = item
+    if time.monotonic() - touched > TTL_SECONDS:
+        del _state[channel_id]
+        return None
+    _state.move_to_end(channel_id)
+    return vouched
+
+
+async def get_vouched(channel_id: int) -> set[str]:
+    """
+    User IDs that already vouched for this ticket. Served from memory;
+    after a restart or eviction it is reloaded from vouchProgress once.
+    """
+    vouched = _cached(channel_id)
+    if vouched is not None:
+        return vouched
+    colls = await collections()
+    doc = await colls["vouchProgress"].find_one({"_id": str(channel_id)}, {"vouched": 1})
+    vouched = set(doc.get("vouched", [])) if doc else set()
+    _put(channel_id, vouched)
+    return vouched
+
+
+async def add_vouch(channel_id: int, user_id) -> set[str]:
+    """Records a vouch (write-through to Mongo) and returns everyone who has vouched so far."""
+    vouched = await get_vouched(channel_id)
+    uid = str(user_id)
+    if uid in vouched:
+        _put(channel_id, vouched)
+        return vouched
+    colls = await collections()
+    await colls["vouchProgress"].update_one(
+        {"_id": str(channel_id)},
+        {"$addToSet": {"vouched": uid}, "$set": {"updatedAt": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    vouched.add(uid)
+    _put(channel_id, vouched)
+    return vouched
+
+
+async def forget(channel_id: int):
+    """Drops a ticket's progress; called when the ticket closes or its channel is deleted."""
+    _state.pop(channel_id, None)
+    colls = await collections()
+    await colls["vouchProgress"].delete_one({"_id": str(channel_id)})
@@ -1,23 +1,70 @@
 import aiohttp.web
+import asyncio
 import os
+from utils import transcript_store
+
+# Named transcripts can be regenerated, so clients revalidate them via ETag.
+# Assets are addressed by their hash and never change.
+TRANSCRIPT_CACHE = "public, no-cache"
+ASSET_CACHE = "public, max-age=31536000, immutable"
 
 async def handle_root(_):
     return aiohttp.web.Response(text="✅ Server is alive")
 
+def _pick_encoding(request: aiohttp.web.Request) -> list[str]:
+    accept = request.headers.get("Accept-Encoding", "").lower()
+    order = []
+    if "br" in accept:
+        order.append("br")
+    if "gzip" in accept:
+        order.append("gzip")
+    order.append("identity")
+    return order
+
+async def _send_object(request: aiohttp.web.Request, digest: str, content_type: str, cache_control: str):
+    etag = f'"{digest}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return aiohttp.web.Response(status=304, headers=headers)
+
+    loop = asyncio.get_running_loop()
+    for encoding in _pick_encoding(request):
+        body = await loop.run_in_executor(None, transcript_store.read_object, digest, encoding)
+        if body is None:
+            continue
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return aiohttp.web.Response(body=body, headers=headers, content_type=content_type.split(";")[0],
+                                    charset="utf-8" if "charset" in content_type else None)
+    return aiohttp.web.Response(status=404, text="Transcript not found.")
+
 async def handle_transcript(request: aiohttp.web.Request):
     filename = request.match_info["filename"]
-    folder = os.path.join(os.getcwd(), "transcripts")
-    path = os.path.join(folder, filename)
-    if not os.path.exists(path):
+    if filename.startswith(".") or os.sep in filename:
+        return aiohttp.web.Response(status=404, text="Transcript not found.")
+
+    ref = await asyncio.get_running_loop().run_in_executor(None, transcript_store.resolve, filename)
+    if ref:
+        return await _send_object(request, ref["digest"], ref["type"], TRANSCRIPT_CACHE)
+
+    # Transcripts written before the compressed store existed are plain files
+    path = os.path.join(transcript_store.STORE_ROOT, filename)
+    if not os.path.isfile(path):
         return aiohttp.web.Response(status=404, text="Transcript not found.")
     return aiohttp.web.FileResponse(path)
 
+async def handle_asset(request: aiohttp.web.Request):
+    digest, _, ext = request.match_info["asset"].partition(".")
+    content_type = transcript_store.ASSET_TYPES.get(ext)
+    if not content_type or not transcript_store.is_digest(digest):
+        return aiohttp.web.Response(status=404, text="Asset not found.")
+    return await _send_object(request, digest, content_type, ASSET_CACHE)
+
 def make_app():
-    folder = os.path.join(os.getcwd(), "transcripts")
-    os.makedirs(folder, exist_ok=True)  # <-- this creates it if missing
+    transcript_store.ensure_dirs()  # <-- this creates it if missing
 
     app = aiohttp.web.Application()
     app.router.add_get("/", handle_root)
-    app.router.add_static("/transcripts", path=folder)
+    app.router.add_get("/transcripts/assets/{asset}", handle_asset)
     app.router.add_get("/transcripts/{filename}", handle_transcript)
-    return app
\ No newline at end of file
+    return app